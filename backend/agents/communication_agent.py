@@ -557,7 +557,7 @@ Provide your response in the following JSON format:
 
 Keep the enhanced content appropriate for professional recruitment communication."""
             
-            response = self.openai_client.chat.completions.create(
+            response = await self.openai_client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are an expert HR communication specialist."},
@@ -288,21 +288,21 @@ class DashboardAgent:
             
         elif kpi_key == "time_to_schedule":
             # Calculate average time from candidate creation to interview scheduling
-            interviews = db.query(Interview, Candidate)\
-                          .join(Candidate, Interview.candidate_id == Candidate.id)\
-                          .filter(Interview.created_at >= start_time)\
-                          .all()
-            
-            if interviews:
-                total_hours = 0
-                count = 0
-                for interview, candidate in interviews:
-                    time_diff = interview.created_at - candidate.created_at
-                    total_hours += time_diff.total_seconds() / 3600
-                    count += 1
-                value = total_hours / count if count > 0 else 0
+            if db.bind.dialect.name == "sqlite":
+                hours_to_schedule = (
+                    func.julianday(Interview.created_at) - func.julianday(Candidate.created_at)
+                ) * 24
             else:
-                value = 0
+                hours_to_schedule = func.extract(
+                    'epoch', Interview.created_at - Candidate.created_at
+                ) / 3600
+            
+            result = db.query(func.avg(hours_to_schedule))\
+                       .select_from(Interview)\
+                       .join(Candidate, Interview.candidate_id == Candidate.id)\
+                       .filter(Interview.created_at >= start_time)\
+                       .scalar()
+            value = float(result) if result else 0
                 
         elif kpi_key == "interview_success_rate":
             total_interviews = db.query(Interview)\
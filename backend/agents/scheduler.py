@@ -9,9 +9,12 @@ from datetime import datetime, timedelta, time
 from typing import List, Dict, Optional, Tuple, Any, Set
 from dataclasses import dataclass
 from enum import Enum
+import calendar
+import heapq
 import json
+import numpy as np
 import pytz
-from operator import itemgetter
+from operator import attrgetter, itemgetter
 
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, desc, asc
@@ -30,6 +33,10 @@ from models.jobs import JobPosition
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _epoch_seconds(dt: datetime) -> int:
+    """Seconds since the epoch, treating naive datetimes as UTC"""
+    return calendar.timegm(dt.utctimetuple())
+
 class SchedulingPriority(str, Enum):
     """Priority levels for scheduling requests"""
     URGENT = "urgent"          # < 24 hours
@@ -44,26 +51,45 @@ class SchedulingStrategy(str, Enum):
     OPTIMIZE_CANDIDATE = "optimize_candidate" # Candidate preference first
     BALANCED = "balanced"                     # Balance all factors
 
-@dataclass
 class TimeSlot:
     """Represents a potential time slot for an interview"""
-    start_time: datetime
-    end_time: datetime
-    score: float = 0.0
-    conflicts: List[str] = None
-    participants_available: List[str] = None
-    participants_unavailable: List[str] = None
-    reasons: List[str] = None
+    __slots__ = (
+        'start_time', 'end_time', 'score', 'conflicts',
+        'participants_available', 'participants_unavailable', 'reasons'
+    )
     
-    def __post_init__(self):
-        if self.conflicts is None:
-            self.conflicts = []
-        if self.participants_available is None:
-            self.participants_available = []
-        if self.participants_unavailable is None:
-            self.participants_unavailable = []
-        if self.reasons is None:
-            self.reasons = []
+    def __init__(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        score: float = 0.0,
+        conflicts: List[str] = None,
+        participants_available: List[str] = None,
+        participants_unavailable: List[str] = None,
+        reasons: List[str] = None
+    ):
+        self.start_time = start_time
+        self.end_time = end_time
+        self.score = score
+        self.conflicts = conflicts if conflicts is not None else []
+        self.participants_available = participants_available if participants_available is not None else []
+        self.participants_unavailable = participants_unavailable if participants_unavailable is not None else []
+        self.reasons = reasons if reasons is not None else []
+    
+    def __repr__(self) -> str:
+        return f"TimeSlot(start_time={self.start_time!r}, end_time={self.end_time!r}, score={self.score!r})"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert slot to API response format"""
+        return dict(zip(self.__slots__, (
+            self.start_time.isoformat(),
+            self.end_time.isoformat(),
+            round(self.score, 3),
+            self.conflicts,
+            self.participants_available,
+            self.participants_unavailable,
+            self.reasons
+        )))
 
 @dataclass
 class SchedulingRequest:
@@ -86,10 +112,12 @@ class SchedulingRequest:
             self.preferred_times = []
         if self.requirements is None:
             self.requirements = {}
-        if self.earliest_start is None:
-            self.earliest_start = datetime.utcnow() + timedelta(hours=24)
-        if self.latest_end is None:
-            self.latest_end = datetime.utcnow() + timedelta(days=30)
+        if self.earliest_start is None or self.latest_end is None:
+            now = datetime.utcnow()
+            if self.earliest_start is None:
+                self.earliest_start = now + timedelta(hours=24)
+            if self.latest_end is None:
+                self.latest_end = now + timedelta(days=30)
 
 class SchedulerAgent:
     """
@@ -177,23 +205,31 @@ class SchedulerAgent:
                 candidate_slots, 
                 request, 
                 availability_data,
-                db
+                db,
+                limit=4  # Best slot plus 3 alternatives
             )
             
             # Step 5: Select best slot
             best_slot = scored_slots[0]
             
             # Step 6: Create interview record
-            interview = await self._create_interview(best_slot, request, db)
+            interview = await self._create_interview(
+                best_slot,
+                request,
+                db,
+                candidate=validation_result['candidate'],
+                job=validation_result['job']
+            )
             
             # Step 7: Log scheduling decision
+            processing_time_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
             await self._log_scheduling_activity(
                 interview.id,
                 "schedule",
                 "success",
                 {
                     'slots_evaluated': len(candidate_slots),
-                    'processing_time_ms': int((datetime.utcnow() - start_time).total_seconds() * 1000),
+                    'processing_time_ms': processing_time_ms,
                     'best_score': best_slot.score,
                     'algorithm': request.strategy,
                     'alternatives': [
@@ -231,7 +267,7 @@ class SchedulerAgent:
                 ],
                 'metadata': {
                     'slots_evaluated': len(candidate_slots),
-                    'processing_time_ms': int((datetime.utcnow() - start_time).total_seconds() * 1000),
+                    'processing_time_ms': processing_time_ms,
                     'strategy_used': request.strategy
                 }
             }
@@ -358,15 +394,14 @@ class SchedulerAgent:
             )
             
             # Score and rank slots
-            scored_slots = await self._score_and_rank_slots(
+            return await self._score_and_rank_slots(
                 candidate_slots, 
                 request, 
                 availability_data,
-                db
+                db,
+                limit=max_slots
             )
             
-            return scored_slots[:max_slots]
-            
         except Exception as e:
             self.logger.error(f"❌ Finding optimal slots failed: {str(e)}")
             return []
@@ -549,8 +584,8 @@ class SchedulerAgent:
         return {
             'valid': len(errors) == 0,
             'errors': errors,
-            'candidate': candidate.to_dict() if candidate else None,
-            'job': job.to_dict() if job else None
+            'candidate': candidate,
+            'job': job
         }
     
     async def _gather_availability(self, request: SchedulingRequest, db: Session) -> Dict[str, Any]:
@@ -564,20 +599,20 @@ class SchedulerAgent:
             if integration:
                 integrations[email] = integration
         
-        # Get existing interviews for interviewers
+        # Get existing interviews overlapping the search window
         existing_interviews = db.query(Interview).filter(
             and_(
                 Interview.status.in_([InterviewStatus.SCHEDULED, InterviewStatus.CONFIRMED]),
-                Interview.scheduled_start >= request.earliest_start,
+                Interview.scheduled_end > request.earliest_start,
                 Interview.scheduled_start <= request.latest_end
             )
         ).all()
         
-        # Get availability slots
+        # Get availability slots overlapping the search window
         availability_slots = db.query(AvailabilitySlot).filter(
             and_(
                 AvailabilitySlot.email.in_(request.interviewer_emails),
-                AvailabilitySlot.start_time >= request.earliest_start,
+                AvailabilitySlot.end_time > request.earliest_start,
                 AvailabilitySlot.start_time <= request.latest_end
             )
         ).all()
@@ -596,53 +631,73 @@ class SchedulerAgent:
         db: Session
     ) -> List[TimeSlot]:
         """Generate all possible time slots for the interview"""
-        slots = []
-        current_time = request.earliest_start
+        duration = timedelta(minutes=request.duration_minutes)
         
+        # Enumerate start times on the 30-minute grid that fall in working hours
+        starts = []
+        current_time = request.earliest_start
         while current_time < request.latest_end:
-            # Skip if outside working hours
-            if not self._is_working_time(current_time):
-                current_time += timedelta(minutes=30)
-                continue
-            
-            # Calculate end time
-            end_time = current_time + timedelta(minutes=request.duration_minutes)
-            
-            # Skip if end time is past latest allowed time
-            if end_time > request.latest_end:
-                break
-            
-            # Create time slot
-            slot = TimeSlot(
-                start_time=current_time,
-                end_time=end_time
-            )
-            
-            # Check for conflicts
-            conflicts = await self.detect_conflicts(
-                current_time,
-                end_time,
-                request.interviewer_emails,
-                db
+            if self._is_working_time(current_time):
+                # Skip if end time is past latest allowed time
+                if current_time + duration > request.latest_end:
+                    break
+                starts.append(current_time)
+            current_time += timedelta(minutes=30)
+        
+        if not starts:
+            return []
+        
+        # Structure-of-arrays layout: candidate slot bounds as epoch seconds
+        slot_start = np.fromiter((_epoch_seconds(dt) for dt in starts), dtype=np.int64, count=len(starts))
+        slot_end = slot_start + int(duration.total_seconds())
+        
+        # Per participant, a (slots x busy intervals) overlap matrix computed by broadcasting
+        overlap_grids = {}
+        for email in request.interviewer_emails:
+            busy = [
+                (
+                    interview.scheduled_start,
+                    interview.scheduled_end,
+                    f"Existing interview: {interview.title} "
+                    f"({interview.scheduled_start.strftime('%H:%M')}-{interview.scheduled_end.strftime('%H:%M')})"
+                )
+                for interview in availability_data['existing_interviews']
+                if email in (interview.interviewer_emails or [])
+            ]
+            busy.extend(
+                (
+                    slot.start_time,
+                    slot.end_time,
+                    f"Busy: {slot.notes or 'Unavailable'} "
+                    f"({slot.start_time.strftime('%H:%M')}-{slot.end_time.strftime('%H:%M')})"
+                )
+                for slot in availability_data['availability_slots']
+                if slot.email == email and slot.availability_type == "busy"
             )
+            if not busy:
+                continue
             
-            slot.conflicts = []
-            slot.participants_unavailable = []
-            for email, email_conflicts in conflicts.items():
-                slot.conflicts.extend(email_conflicts)
-                slot.participants_unavailable.append(email)
-            
-            slot.participants_available = [
-                email for email in request.interviewer_emails 
-                if email not in slot.participants_unavailable
-            ]
+            busy_start = np.fromiter((_epoch_seconds(b[0]) for b in busy), dtype=np.int64, count=len(busy))
+            busy_end = np.fromiter((_epoch_seconds(b[1]) for b in busy), dtype=np.int64, count=len(busy))
+            overlaps = (slot_start[:, None] < busy_end[None, :]) & (slot_end[:, None] > busy_start[None, :])
+            overlap_grids[email] = (overlaps, overlaps.any(axis=1), [b[2] for b in busy])
+        
+        slots = []
+        for index, start in enumerate(starts):
+            slot = TimeSlot(start_time=start, end_time=start + duration)
+            
+            for email in request.interviewer_emails:
+                grid = overlap_grids.get(email)
+                if grid is not None and grid[1][index]:
+                    overlaps, _, messages = grid
+                    slot.conflicts.extend(messages[j] for j in np.flatnonzero(overlaps[index]))
+                    slot.participants_unavailable.append(email)
+                else:
+                    slot.participants_available.append(email)
             
             # Only add slots with at least one available participant
             if slot.participants_available:
                 slots.append(slot)
-            
-            # Move to next slot (30-minute intervals)
-            current_time += timedelta(minutes=30)
         
         return slots
     
@@ -651,9 +706,16 @@ class SchedulerAgent:
         slots: List[TimeSlot],
         request: SchedulingRequest,
         availability_data: Dict,
-        db: Session
+        db: Session,
+        limit: Optional[int] = None
     ) -> List[TimeSlot]:
-        """Score and rank time slots based on multiple criteria"""
+        """
+        Score and rank time slots based on multiple criteria
+        
+        When limit is given only the top slots are selected, using a bounded
+        heap instead of sorting every candidate.
+        """
+        now = datetime.utcnow()
         
         for slot in slots:
             score = 0.0
@@ -684,7 +746,7 @@ class SchedulerAgent:
                 reasons.append("Convenient for candidate")
             
             # 5. Urgency factor (10%)
-            urgency_score = self._score_urgency_factor(slot, request)
+            urgency_score = self._score_urgency_factor(slot, request, now)
             score += urgency_score * self.scoring_weights['urgency_factor']
             if urgency_score > 0.5:
                 reasons.append("Meets urgency requirements")
@@ -698,7 +760,9 @@ class SchedulerAgent:
             slot.reasons = reasons
         
         # Sort by score (descending)
-        return sorted(slots, key=lambda x: x.score, reverse=True)
+        if limit is not None:
+            return heapq.nlargest(limit, slots, key=attrgetter('score'))
+        return sorted(slots, key=attrgetter('score'), reverse=True)
     
     def _score_time_preference(self, slot: TimeSlot, request: SchedulingRequest) -> float:
         """Score based on time preferences"""
@@ -768,9 +832,9 @@ class SchedulerAgent:
         except:
             return 0.8  # Default score if timezone handling fails
     
-    def _score_urgency_factor(self, slot: TimeSlot, request: SchedulingRequest) -> float:
+    def _score_urgency_factor(self, slot: TimeSlot, request: SchedulingRequest, now: Optional[datetime] = None) -> float:
         """Score based on urgency and how soon the slot is"""
-        time_diff = slot.start_time - datetime.utcnow()
+        time_diff = slot.start_time - (now or datetime.utcnow())
         hours_until = time_diff.total_seconds() / 3600
         
         if request.priority == SchedulingPriority.URGENT:
@@ -799,11 +863,20 @@ class SchedulerAgent:
             self.working_hours_start <= dt.time() <= self.working_hours_end
         )
     
-    async def _create_interview(self, slot: TimeSlot, request: SchedulingRequest, db: Session) -> Interview:
+    async def _create_interview(
+        self,
+        slot: TimeSlot,
+        request: SchedulingRequest,
+        db: Session,
+        candidate: Optional[Candidate] = None,
+        job: Optional[JobPosition] = None
+    ) -> Interview:
         """Create interview record from selected slot"""
-        # Get candidate and job info
-        candidate = db.query(Candidate).filter(Candidate.id == request.candidate_id).first()
-        job = db.query(JobPosition).filter(JobPosition.id == request.job_position_id).first()
+        # Get candidate and job info unless already loaded during validation
+        if candidate is None:
+            candidate = db.query(Candidate).filter(Candidate.id == request.candidate_id).first()
+        if job is None:
+            job = db.query(JobPosition).filter(JobPosition.id == request.job_position_id).first()
         
         # Create interview
         interview = Interview(
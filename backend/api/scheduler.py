@@ -3,16 +3,24 @@ RecruitAI Pro Scheduler API
 RESTful endpoints for intelligent interview scheduling and calendar management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, insert, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, validator
+from typing import Iterable, List, Optional, Dict, Any, Tuple
+from pydantic import BaseModel, ConfigDict, Field
+from cachetools import TTLCache
+import asyncio
+import orjson
 import uuid
 import logging
 
-from core.database import get_db
+from core.database import get_db, get_async_db
+from core.message_broker import message_broker
 from agents.scheduler import scheduler_agent, SchedulingRequest, SchedulingPriority, SchedulingStrategy, InterviewType
 from models.interviews import Interview, AvailabilitySlot, CalendarIntegration, SchedulingLog, InterviewStatus
 from models.candidates import Candidate
@@ -22,57 +30,110 @@ from models.jobs import JobPosition
 logger = logging.getLogger(__name__)
 
 # Create router
-router = APIRouter(prefix="/scheduler", tags=["scheduler"])
+router = APIRouter(prefix="/scheduler", tags=["scheduler"], default_response_class=ORJSONResponse)
+
+# Short-lived cache for conflict checks, keyed by (start, end, sorted emails,
+# their versions). The UI polls the same slot repeatedly while a user picks a time.
+# Each email has a version counter in Redis that every worker bumps when that
+# person's schedule changes, so entries cached by other workers stop matching.
+_conflict_cache: TTLCache = TTLCache(maxsize=4096, ttl=15)
+_conflict_cache_lock = asyncio.Lock()
+_CONFLICT_VERSION_PREFIX = "scheduler:conflicts:version"
+_CONFLICT_VERSION_TTL = 86400  # far beyond the cache TTL, so a reset counter can't match a live entry
+
+async def _get_conflict_versions(emails: Tuple[str, ...]) -> Optional[Tuple[Any, ...]]:
+    """Current schedule versions for the given emails (None if they can't be read)"""
+    if not message_broker.connected:
+        # Single-process mock mode: local invalidation is enough
+        return ()
+    try:
+        return tuple(await message_broker.redis_client.mget(
+            [f"{_CONFLICT_VERSION_PREFIX}:{email}" for email in emails]
+        ))
+    except Exception as e:
+        logger.warning("⚠️ Conflict cache unavailable: %s", e)
+        return None
+
+async def _invalidate_conflict_cache(emails: Iterable[str]) -> None:
+    """Drop cached conflict results involving any of the given emails, in every worker"""
+    affected = set(emails)
+    async with _conflict_cache_lock:
+        stale_keys = [key for key in _conflict_cache.keys() if affected.intersection(key[2])]
+        for key in stale_keys:
+            _conflict_cache.pop(key, None)
+    
+    if not affected or not message_broker.connected:
+        return
+    try:
+        async with message_broker.redis_client.pipeline(transaction=False) as pipe:
+            for email in affected:
+                pipe.incr(f"{_CONFLICT_VERSION_PREFIX}:{email}")
+                pipe.expire(f"{_CONFLICT_VERSION_PREFIX}:{email}", _CONFLICT_VERSION_TTL)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("⚠️ Failed to invalidate conflict cache: %s", e)
+
+# Scheduling analytics are cached in Redis for a short TTL; the version
+# counter is bumped whenever interviews change so stale entries are skipped.
+ANALYTICS_CACHE_TTL = 30
+_ANALYTICS_VERSION_KEY = "analytics:scheduler:version"
+
+async def _get_analytics_cache_key(start_date: Optional[datetime], end_date: Optional[datetime]) -> Optional[str]:
+    """Build the analytics cache key for the raw query parameters (None if Redis is unavailable)"""
+    if not message_broker.connected:
+        return None
+    try:
+        version = await message_broker.redis_client.get(_ANALYTICS_VERSION_KEY) or 0
+    except Exception as e:
+        logger.warning("⚠️ Analytics cache unavailable: %s", e)
+        return None
+    start = start_date.isoformat() if start_date else "default"
+    end = end_date.isoformat() if end_date else "now"
+    return f"analytics:scheduler:v{version}:{start}:{end}"
+
+async def _invalidate_analytics_cache() -> None:
+    """Invalidate cached scheduling analytics"""
+    if not message_broker.connected:
+        return
+    try:
+        await message_broker.redis_client.incr(_ANALYTICS_VERSION_KEY)
+    except Exception as e:
+        logger.warning("⚠️ Failed to invalidate analytics cache: %s", e)
 
 # Pydantic models for request/response
 
 class ScheduleInterviewRequest(BaseModel):
     """Request model for scheduling interviews"""
+    model_config = ConfigDict(frozen=True)
+    
     candidate_id: str = Field(..., description="ID of the candidate")
     job_position_id: str = Field(..., description="ID of the job position")
-    interview_type: str = Field(..., description="Type of interview")
+    interview_type: InterviewType = Field(..., description="Type of interview")
     interviewer_emails: List[str] = Field(..., description="List of interviewer emails")
     duration_minutes: int = Field(60, ge=15, le=480, description="Interview duration in minutes")
     earliest_start: Optional[datetime] = Field(None, description="Earliest possible start time")
     latest_end: Optional[datetime] = Field(None, description="Latest possible end time")
     timezone: str = Field("UTC", description="Timezone for the interview")
-    priority: str = Field("medium", description="Scheduling priority")
-    strategy: str = Field("balanced", description="Scheduling strategy")
+    priority: SchedulingPriority = Field(SchedulingPriority.MEDIUM, description="Scheduling priority")
+    strategy: SchedulingStrategy = Field(SchedulingStrategy.BALANCED, description="Scheduling strategy")
     preferred_times: List[Dict] = Field([], description="Preferred time slots")
     requirements: Dict = Field({}, description="Additional requirements")
-    
-    @validator('interview_type')
-    def validate_interview_type(cls, v):
-        valid_types = [t.value for t in InterviewType]
-        if v not in valid_types:
-            raise ValueError(f"Invalid interview type. Must be one of: {valid_types}")
-        return v
-    
-    @validator('priority')
-    def validate_priority(cls, v):
-        valid_priorities = [p.value for p in SchedulingPriority]
-        if v not in valid_priorities:
-            raise ValueError(f"Invalid priority. Must be one of: {valid_priorities}")
-        return v
-    
-    @validator('strategy')
-    def validate_strategy(cls, v):
-        valid_strategies = [s.value for s in SchedulingStrategy]
-        if v not in valid_strategies:
-            raise ValueError(f"Invalid strategy. Must be one of: {valid_strategies}")
-        return v
 
 class RescheduleInterviewRequest(BaseModel):
     """Request model for rescheduling interviews"""
+    model_config = ConfigDict(frozen=True)
+    
     reason: str = Field(..., description="Reason for rescheduling")
     new_earliest_start: Optional[datetime] = Field(None, description="New earliest start time")
     new_latest_end: Optional[datetime] = Field(None, description="New latest end time")
     new_interviewer_emails: Optional[List[str]] = Field(None, description="Updated interviewer emails")
     new_duration_minutes: Optional[int] = Field(None, ge=15, le=480, description="Updated duration")
-    priority: str = Field("high", description="Rescheduling priority")
+    priority: SchedulingPriority = Field(SchedulingPriority.HIGH, description="Rescheduling priority")
 
 class AvailabilitySlotRequest(BaseModel):
     """Request model for availability slots"""
+    model_config = ConfigDict(frozen=True)
+    
     email: str = Field(..., description="User email")
     user_type: str = Field(..., description="Type of user (interviewer, candidate)")
     start_time: datetime = Field(..., description="Start time of availability slot")
@@ -86,6 +147,8 @@ class AvailabilitySlotRequest(BaseModel):
 
 class CalendarIntegrationRequest(BaseModel):
     """Request model for calendar integration setup"""
+    model_config = ConfigDict(frozen=True)
+    
     email: str = Field(..., description="User email")
     name: str = Field(..., description="User name")
     user_type: str = Field(..., description="Type of user")
@@ -98,13 +161,15 @@ class CalendarIntegrationRequest(BaseModel):
 
 class ConflictCheckRequest(BaseModel):
     """Request model for conflict checking"""
+    model_config = ConfigDict(frozen=True)
+    
     start_time: datetime = Field(..., description="Start time to check")
     end_time: datetime = Field(..., description="End time to check")
     participant_emails: List[str] = Field(..., description="List of participant emails")
 
 # API Endpoints
 
-@router.post("/schedule", response_model=Dict[str, Any])
+@router.post("/schedule", response_model=Dict[str, Any], status_code=201)
 async def schedule_interview(
     request: ScheduleInterviewRequest,
     db: Session = Depends(get_db)
@@ -118,52 +183,47 @@ async def schedule_interview(
     - Conflict detection
     - Multi-criteria optimization
     """
-    try:
-        logger.info(f"📅 Scheduling interview for candidate {request.candidate_id}")
-        
-        # Convert request to internal format
-        scheduling_request = SchedulingRequest(
-            candidate_id=request.candidate_id,
-            job_position_id=request.job_position_id,
-            interview_type=InterviewType(request.interview_type),
-            interviewer_emails=request.interviewer_emails,
-            duration_minutes=request.duration_minutes,
-            earliest_start=request.earliest_start or (datetime.utcnow() + timedelta(hours=24)),
-            latest_end=request.latest_end or (datetime.utcnow() + timedelta(days=30)),
-            timezone=request.timezone,
-            priority=SchedulingPriority(request.priority),
-            strategy=SchedulingStrategy(request.strategy),
-            preferred_times=request.preferred_times,
-            requirements=request.requirements
+    logger.info("📅 Scheduling interview for candidate %s", request.candidate_id)
+    now = datetime.utcnow()
+    
+    # Convert request to internal format
+    scheduling_request = SchedulingRequest(
+        candidate_id=request.candidate_id,
+        job_position_id=request.job_position_id,
+        interview_type=request.interview_type,
+        interviewer_emails=request.interviewer_emails,
+        duration_minutes=request.duration_minutes,
+        earliest_start=request.earliest_start or (now + timedelta(hours=24)),
+        latest_end=request.latest_end or (now + timedelta(days=30)),
+        timezone=request.timezone,
+        priority=request.priority,
+        strategy=request.strategy,
+        preferred_times=request.preferred_times,
+        requirements=request.requirements
+    )
+    
+    # Schedule the interview
+    result = await scheduler_agent.schedule_interview(scheduling_request, db)
+    
+    if result['success']:
+        await _invalidate_conflict_cache(request.interviewer_emails)
+        await _invalidate_analytics_cache()
+        logger.info("✅ Successfully scheduled interview %s", result['interview']['id'])
+        return {
+            "success": True,
+            "message": "Interview scheduled successfully",
+            "data": result
+        }
+    else:
+        logger.warning("⚠️ Scheduling failed: %s", result['errors'])
+        return ORJSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "message": "Failed to schedule interview",
+                "errors": result['errors']
+            }
         )
-        
-        # Schedule the interview
-        result = await scheduler_agent.schedule_interview(scheduling_request, db)
-        
-        if result['success']:
-            logger.info(f"✅ Successfully scheduled interview {result['interview']['id']}")
-            return JSONResponse(
-                status_code=201,
-                content={
-                    "success": True,
-                    "message": "Interview scheduled successfully",
-                    "data": result
-                }
-            )
-        else:
-            logger.warning(f"⚠️ Scheduling failed: {result['errors']}")
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "success": False,
-                    "message": "Failed to schedule interview",
-                    "errors": result['errors']
-                }
-            )
-            
-    except Exception as e:
-        logger.error(f"❌ Error scheduling interview: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.put("/interviews/{interview_id}/reschedule", response_model=Dict[str, Any])
 async def reschedule_interview(
@@ -180,64 +240,63 @@ async def reschedule_interview(
     - Logging reschedule reasons
     - Sending notifications
     """
-    try:
-        logger.info(f"🔄 Rescheduling interview {interview_id}")
-        
-        # Get existing interview
-        interview = db.query(Interview).filter(Interview.id == interview_id).first()
-        if not interview:
-            raise HTTPException(status_code=404, detail="Interview not found")
-        
-        # Create new scheduling request if parameters are provided
-        new_request = None
-        if any([request.new_earliest_start, request.new_latest_end, 
-                request.new_interviewer_emails, request.new_duration_minutes]):
-            new_request = SchedulingRequest(
-                candidate_id=str(interview.candidate_id),
-                job_position_id=str(interview.job_position_id),
-                interview_type=InterviewType(interview.interview_type),
-                interviewer_emails=request.new_interviewer_emails or interview.interviewer_emails,
-                duration_minutes=request.new_duration_minutes or interview.duration_minutes,
-                earliest_start=request.new_earliest_start or (datetime.utcnow() + timedelta(hours=24)),
-                latest_end=request.new_latest_end or (datetime.utcnow() + timedelta(days=30)),
-                timezone=interview.timezone,
-                priority=SchedulingPriority(request.priority)
-            )
-        
-        # Reschedule the interview
-        result = await scheduler_agent.reschedule_interview(
-            interview_id, 
-            request.reason, 
-            new_request, 
-            db
+    logger.info("🔄 Rescheduling interview %s", interview_id)
+    
+    # Get existing interview
+    interview = db.query(Interview).filter(Interview.id == interview_id).first()
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    # Captured before rescheduling, which may replace the interviewer list
+    previous_interviewers = list(interview.interviewer_emails or [])
+    
+    # Create new scheduling request if parameters are provided
+    new_request = None
+    if (request.new_earliest_start or request.new_latest_end or
+            request.new_interviewer_emails or request.new_duration_minutes):
+        now = datetime.utcnow()
+        new_request = SchedulingRequest(
+            candidate_id=str(interview.candidate_id),
+            job_position_id=str(interview.job_position_id),
+            interview_type=InterviewType(interview.interview_type),
+            interviewer_emails=request.new_interviewer_emails or interview.interviewer_emails,
+            duration_minutes=request.new_duration_minutes or interview.duration_minutes,
+            earliest_start=request.new_earliest_start or (now + timedelta(hours=24)),
+            latest_end=request.new_latest_end or (now + timedelta(days=30)),
+            timezone=interview.timezone,
+            priority=request.priority
+        )
+    
+    # Reschedule the interview
+    result = await scheduler_agent.reschedule_interview(
+        interview_id, 
+        request.reason, 
+        new_request, 
+        db
+    )
+    
+    if result['success']:
+        # Both the old and the new interviewers' calendars changed
+        await _invalidate_conflict_cache(
+            set(result['new_interview'].get('interviewer_emails') or []) | set(previous_interviewers)
+        )
+        await _invalidate_analytics_cache()
+        logger.info("✅ Successfully rescheduled interview %s", interview_id)
+        return {
+            "success": True,
+            "message": "Interview rescheduled successfully",
+            "data": result
+        }
+    else:
+        logger.warning("⚠️ Rescheduling failed: %s", result['errors'])
+        return ORJSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "message": "Failed to reschedule interview",
+                "errors": result['errors']
+            }
         )
-        
-        if result['success']:
-            logger.info(f"✅ Successfully rescheduled interview {interview_id}")
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "success": True,
-                    "message": "Interview rescheduled successfully",
-                    "data": result
-                }
-            )
-        else:
-            logger.warning(f"⚠️ Rescheduling failed: {result['errors']}")
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "success": False,
-                    "message": "Failed to reschedule interview",
-                    "errors": result['errors']
-                }
-            )
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"❌ Error rescheduling interview: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/interviews", response_model=Dict[str, Any])
 async def get_interviews(
@@ -248,7 +307,7 @@ async def get_interviews(
     end_date: Optional[datetime] = Query(None, description="Filter to end date"),
     limit: int = Query(50, ge=1, le=100, description="Number of interviews to return"),
     offset: int = Query(0, ge=0, description="Number of interviews to skip"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     📋 Get interviews with filtering and pagination
@@ -259,101 +318,96 @@ async def get_interviews(
     - Candidate ID
     - Date range
     """
-    try:
-        query = db.query(Interview)
-        
-        # Apply filters
-        if status:
-            query = query.filter(Interview.status == status)
-        
-        if interviewer_email:
-            query = query.filter(Interview.interviewer_emails.contains([interviewer_email]))
-        
-        if candidate_id:
-            query = query.filter(Interview.candidate_id == candidate_id)
-        
-        if start_date:
-            query = query.filter(Interview.scheduled_start >= start_date)
-        
-        if end_date:
-            query = query.filter(Interview.scheduled_start <= end_date)
-        
-        # Get total count
-        total_count = query.count()
-        
-        # Apply pagination and ordering
-        interviews = query.order_by(Interview.scheduled_start.desc()).offset(offset).limit(limit).all()
-        
-        # Convert to dictionaries
-        interview_data = [interview.to_dict() for interview in interviews]
-        
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "data": {
-                    "interviews": interview_data,
-                    "total_count": total_count,
-                    "limit": limit,
-                    "offset": offset,
-                    "has_more": offset + limit < total_count
-                }
-            }
-        )
-        
-    except Exception as e:
-        logger.error(f"❌ Error fetching interviews: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    # Build filters once and share them between the count and page queries
+    filters = []
+    if status:
+        filters.append(Interview.status == status)
+    
+    if interviewer_email:
+        filters.append(Interview.interviewer_emails.contains([interviewer_email]))
+    
+    if candidate_id:
+        filters.append(Interview.candidate_id == candidate_id)
+    
+    if start_date:
+        filters.append(Interview.scheduled_start >= start_date)
+    
+    if end_date:
+        filters.append(Interview.scheduled_start <= end_date)
+    
+    # Get total count with a plain SELECT count(...) rather than a counted subquery
+    total_count = (await db.execute(
+        select(func.count(Interview.id)).where(*filters)
+    )).scalar_one()
+    
+    # Apply pagination and ordering
+    interviews = (await db.scalars(
+        select(Interview).where(*filters).order_by(
+            Interview.scheduled_start.desc()
+        ).offset(offset).limit(limit)
+    )).all()
+    
+    # Convert to dictionaries
+    interview_data = [interview.to_dict() for interview in interviews]
+    
+    return {
+        "success": True,
+        "data": {
+            "interviews": interview_data,
+            "total_count": total_count,
+            "limit": limit,
+            "offset": offset,
+            "has_more": offset + limit < total_count
+        }
+    }
 
 @router.get("/interviews/{interview_id}", response_model=Dict[str, Any])
 async def get_interview(
     interview_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     📄 Get detailed information about a specific interview
     """
-    try:
-        interview = db.query(Interview).filter(Interview.id == interview_id).first()
-        
-        if not interview:
-            raise HTTPException(status_code=404, detail="Interview not found")
-        
-        # Get related candidate and job information
-        candidate = db.query(Candidate).filter(Candidate.id == interview.candidate_id).first()
-        job = db.query(JobPosition).filter(JobPosition.id == interview.job_position_id).first()
-        
-        # Get scheduling logs for this interview
-        logs = db.query(SchedulingLog).filter(
+    interview = (await db.scalars(
+        select(Interview).where(Interview.id == interview_id)
+    )).first()
+    
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    # Get related candidate and job information
+    candidate = (await db.scalars(
+        select(Candidate).where(Candidate.id == interview.candidate_id)
+    )).first()
+    job = (await db.scalars(
+        select(JobPosition).where(JobPosition.id == interview.job_position_id)
+    )).first()
+    
+    # Get scheduling logs for this interview
+    logs = (await db.scalars(
+        select(SchedulingLog).where(
             SchedulingLog.interview_id == interview_id
-        ).order_by(SchedulingLog.created_at.desc()).limit(10).all()
-        
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "data": {
-                    "interview": interview.to_dict(),
-                    "candidate": candidate.to_dict() if candidate else None,
-                    "job": job.to_dict() if job else None,
-                    "scheduling_logs": [
-                        {
-                            "action_type": log.action_type,
-                            "action_status": log.action_status,
-                            "created_at": log.created_at.isoformat(),
-                            "processing_time_ms": log.processing_time_ms,
-                            "slots_evaluated": log.slots_evaluated
-                        } for log in logs
-                    ]
-                }
-            }
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"❌ Error fetching interview: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        ).order_by(SchedulingLog.created_at.desc()).limit(10)
+    )).all()
+    
+    return {
+        "success": True,
+        "data": {
+            "interview": interview.to_dict(),
+            "candidate": candidate.to_dict() if candidate else None,
+            "job": job.to_dict() if job else None,
+            "scheduling_logs": [
+                {
+                    "action_type": log.action_type,
+                    "action_status": log.action_status,
+                    "created_at": log.created_at.isoformat(),
+                    "processing_time_ms": log.processing_time_ms,
+                    "slots_evaluated": log.slots_evaluated
+                } for log in logs
+            ]
+        }
+    }
 
 @router.post("/conflicts/check", response_model=Dict[str, Any])
 async def check_conflicts(
@@ -368,41 +422,47 @@ async def check_conflicts(
     - Busy calendar slots
     - Availability preferences
     """
-    try:
+    emails = tuple(sorted(request.participant_emails))
+    versions = await _get_conflict_versions(emails)
+    cache_key = None
+    conflicts = None
+    if versions is not None:
+        # Without versions another worker's writes can't be seen, so skip the cache
+        cache_key = (request.start_time.isoformat(), request.end_time.isoformat(), emails, versions)
+        async with _conflict_cache_lock:
+            conflicts = _conflict_cache.get(cache_key)
+    
+    if conflicts is None:
         conflicts = await scheduler_agent.detect_conflicts(
             request.start_time,
             request.end_time,
             request.participant_emails,
             db
         )
-        
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "data": {
-                    "has_conflicts": bool(conflicts),
-                    "conflicts": conflicts,
-                    "conflict_summary": {
-                        "total_conflicts": sum(len(emails) for emails in conflicts.values()),
-                        "affected_participants": len(conflicts),
-                        "available_participants": [
-                            email for email in request.participant_emails 
-                            if email not in conflicts
-                        ]
-                    }
-                }
+        if cache_key is not None:
+            async with _conflict_cache_lock:
+                _conflict_cache[cache_key] = conflicts
+    
+    return {
+        "success": True,
+        "data": {
+            "has_conflicts": bool(conflicts),
+            "conflicts": conflicts,
+            "conflict_summary": {
+                "total_conflicts": sum(len(emails) for emails in conflicts.values()),
+                "affected_participants": len(conflicts),
+                "available_participants": [
+                    email for email in request.participant_emails 
+                    if email not in conflicts
+                ]
             }
-        )
-        
-    except Exception as e:
-        logger.error(f"❌ Error checking conflicts: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        }
+    }
 
-@router.post("/availability", response_model=Dict[str, Any])
+@router.post("/availability", response_model=Dict[str, Any], status_code=201)
 async def create_availability_slot(
     request: AvailabilitySlotRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ✅ Create an availability slot for a user
@@ -413,42 +473,70 @@ async def create_availability_slot(
     - Recurring patterns
     - Priority levels
     """
-    try:
-        # Create availability slot
-        availability_slot = AvailabilitySlot(
-            email=request.email,
-            user_type=request.user_type,
-            start_time=request.start_time,
-            end_time=request.end_time,
-            timezone=request.timezone,
-            availability_type=request.availability_type,
-            recurring=request.recurring,
-            recurrence_pattern=request.recurrence_pattern,
-            notes=request.notes,
-            priority=request.priority,
-            source="manual"
-        )
-        
-        db.add(availability_slot)
-        db.commit()
-        db.refresh(availability_slot)
-        
-        logger.info(f"✅ Created availability slot for {request.email}")
-        
-        return JSONResponse(
-            status_code=201,
-            content={
-                "success": True,
-                "message": "Availability slot created successfully",
-                "data": {
-                    "availability_slot": availability_slot.to_dict()
-                }
-            }
-        )
-        
-    except Exception as e:
-        logger.error(f"❌ Error creating availability slot: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    # Create availability slot
+    availability_slot = AvailabilitySlot(
+        email=request.email,
+        user_type=request.user_type,
+        start_time=request.start_time,
+        end_time=request.end_time,
+        timezone=request.timezone,
+        availability_type=request.availability_type,
+        recurring=request.recurring,
+        recurrence_pattern=request.recurrence_pattern,
+        notes=request.notes,
+        priority=request.priority,
+        source="manual"
+    )
+    
+    db.add(availability_slot)
+    await db.commit()
+    await db.refresh(availability_slot)
+    
+    await _invalidate_conflict_cache([request.email])
+    
+    logger.info("✅ Created availability slot for %s", request.email)
+    
+    return {
+        "success": True,
+        "message": "Availability slot created successfully",
+        "data": {
+            "availability_slot": availability_slot.to_dict()
+        }
+    }
+
+@router.post("/availability/bulk", response_model=Dict[str, Any], status_code=201)
+async def create_availability_slots_bulk(
+    requests: List[AvailabilitySlotRequest] = Body(..., description="Availability slots to create"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    📥 Create many availability slots in one request
+    
+    Intended for calendar sync, which typically pushes dozens of slots at once.
+    Rows are inserted in a single batch without per-row refreshes.
+    """
+    if not requests:
+        raise HTTPException(status_code=400, detail="At least one availability slot is required")
+    
+    mappings = [dict(slot_request.model_dump(), source="manual") for slot_request in requests]
+    
+    # ORM bulk INSERT: one executemany, no per-row unit-of-work bookkeeping
+    await db.execute(insert(AvailabilitySlot), mappings)
+    await db.commit()
+    
+    emails = sorted({slot_request.email for slot_request in requests})
+    await _invalidate_conflict_cache(emails)
+    
+    logger.info("✅ Created %s availability slots for %s users", len(mappings), len(emails))
+    
+    return {
+        "success": True,
+        "message": "Availability slots created successfully",
+        "data": {
+            "created_count": len(mappings),
+            "emails": emails
+        }
+    }
 
 @router.get("/availability/{email}", response_model=Dict[str, Any])
 async def get_availability(
@@ -466,58 +554,51 @@ async def get_availability(
     - Calendar sync status
     - Working hours preferences
     """
-    try:
-        # Set default date range if not provided
-        if not start_date:
-            start_date = datetime.utcnow()
-        if not end_date:
-            end_date = start_date + timedelta(days=30)
-        
-        # Get availability slots
-        query = db.query(AvailabilitySlot).filter(AvailabilitySlot.email == email)
-        
-        if start_date:
-            query = query.filter(AvailabilitySlot.start_time >= start_date)
-        if end_date:
-            query = query.filter(AvailabilitySlot.start_time <= end_date)
-        
-        availability_slots = query.order_by(AvailabilitySlot.start_time).all()
-        
-        # Get calendar integration
-        calendar_integration = db.query(CalendarIntegration).filter(
-            CalendarIntegration.email == email
-        ).first()
-        
-        # Get availability summary
-        availability_summary = await scheduler_agent.get_availability_summary(
-            [email], start_date, end_date, db
-        )
-        
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "data": {
-                    "email": email,
-                    "availability_slots": [slot.to_dict() for slot in availability_slots],
-                    "calendar_integration": calendar_integration.to_dict() if calendar_integration else None,
-                    "summary": availability_summary.get(email, {}),
-                    "date_range": {
-                        "start_date": start_date.isoformat(),
-                        "end_date": end_date.isoformat()
-                    }
-                }
+    # Set default date range if not provided
+    if not start_date:
+        start_date = datetime.utcnow()
+    if not end_date:
+        end_date = start_date + timedelta(days=30)
+    
+    # Get availability slots
+    query = db.query(AvailabilitySlot).filter(AvailabilitySlot.email == email)
+    
+    if start_date:
+        query = query.filter(AvailabilitySlot.start_time >= start_date)
+    if end_date:
+        query = query.filter(AvailabilitySlot.start_time <= end_date)
+    
+    availability_slots = query.order_by(AvailabilitySlot.start_time).all()
+    
+    # Get calendar integration
+    calendar_integration = db.query(CalendarIntegration).filter(
+        CalendarIntegration.email == email
+    ).first()
+    
+    # Get availability summary
+    availability_summary = await scheduler_agent.get_availability_summary(
+        [email], start_date, end_date, db
+    )
+    
+    return {
+        "success": True,
+        "data": {
+            "email": email,
+            "availability_slots": [slot.to_dict() for slot in availability_slots],
+            "calendar_integration": calendar_integration.to_dict() if calendar_integration else None,
+            "summary": availability_summary.get(email, {}),
+            "date_range": {
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat()
             }
-        )
-        
-    except Exception as e:
-        logger.error(f"❌ Error fetching availability: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        }
+    }
 
 @router.post("/calendar-integration", response_model=Dict[str, Any])
 async def setup_calendar_integration(
     request: CalendarIntegrationRequest,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     🔗 Set up calendar integration for a user
@@ -528,65 +609,60 @@ async def setup_calendar_integration(
     - Sync preferences
     - Timezone settings
     """
-    try:
-        # Check if integration already exists
-        existing_integration = db.query(CalendarIntegration).filter(
-            CalendarIntegration.email == request.email
-        ).first()
-        
-        if existing_integration:
-            # Update existing integration
-            existing_integration.name = request.name
-            existing_integration.user_type = request.user_type
-            existing_integration.provider = request.provider
-            existing_integration.working_hours_start = request.working_hours_start
-            existing_integration.working_hours_end = request.working_hours_end
-            existing_integration.working_days = request.working_days
-            existing_integration.timezone = request.timezone
-            existing_integration.sync_enabled = request.sync_enabled
-            
-            db.commit()
-            db.refresh(existing_integration)
-            
-            calendar_integration = existing_integration
-            action = "updated"
-        else:
-            # Create new integration
-            calendar_integration = CalendarIntegration(
-                email=request.email,
-                name=request.name,
-                user_type=request.user_type,
-                provider=request.provider,
-                working_hours_start=request.working_hours_start,
-                working_hours_end=request.working_hours_end,
-                working_days=request.working_days,
-                timezone=request.timezone,
-                sync_enabled=request.sync_enabled,
-                connected_at=datetime.utcnow()
-            )
-            
-            db.add(calendar_integration)
-            db.commit()
-            db.refresh(calendar_integration)
-            
-            action = "created"
-        
-        logger.info(f"✅ Calendar integration {action} for {request.email}")
-        
-        return JSONResponse(
-            status_code=201 if action == "created" else 200,
-            content={
-                "success": True,
-                "message": f"Calendar integration {action} successfully",
-                "data": {
-                    "calendar_integration": calendar_integration.to_dict()
-                }
-            }
-        )
-        
-    except Exception as e:
-        logger.error(f"❌ Error setting up calendar integration: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    now = datetime.utcnow()
+    settings_payload = {
+        "name": request.name,
+        "user_type": request.user_type,
+        "provider": request.provider,
+        "working_hours_start": request.working_hours_start,
+        "working_hours_end": request.working_hours_end,
+        "working_days": request.working_days,
+        "timezone": request.timezone,
+        "sync_enabled": request.sync_enabled
+    }
+    
+    # Insert or update in a single statement keyed on the unique email
+    is_postgres = db.bind.dialect.name == "postgresql"
+    dialect_insert = pg_insert if is_postgres else sqlite_insert
+    stmt = dialect_insert(CalendarIntegration).values(
+        email=request.email,
+        connected_at=now,
+        **settings_payload
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CalendarIntegration.email],
+        set_=settings_payload
+    )
+    
+    if is_postgres:
+        # xmax is 0 only for a freshly inserted row version
+        row = (await db.execute(
+            stmt.returning(CalendarIntegration, literal_column("xmax = 0").label("inserted")),
+            execution_options={"populate_existing": True}
+        )).one()
+        calendar_integration, created = row
+    else:
+        # SQLite has no equivalent marker, so check for the row first
+        created = (await db.execute(
+            select(CalendarIntegration.id).where(CalendarIntegration.email == request.email)
+        )).first() is None
+        calendar_integration = (await db.scalars(
+            stmt.returning(CalendarIntegration), execution_options={"populate_existing": True}
+        )).one()
+    await db.commit()
+    
+    action = "created" if created else "updated"
+    response.status_code = 201 if action == "created" else 200
+    
+    logger.info("✅ Calendar integration %s for %s", action, request.email)
+    
+    return {
+        "success": True,
+        "message": f"Calendar integration {action} successfully",
+        "data": {
+            "calendar_integration": calendar_integration.to_dict()
+        }
+    }
 
 @router.get("/optimal-slots", response_model=Dict[str, Any])
 async def find_optimal_slots(
@@ -611,14 +687,15 @@ async def find_optimal_slots(
     """
     try:
         # Create scheduling request
+        now = datetime.utcnow()
         scheduling_request = SchedulingRequest(
             candidate_id=candidate_id,
             job_position_id=job_position_id,
             interview_type=InterviewType(interview_type),
             interviewer_emails=interviewer_emails,
             duration_minutes=duration_minutes,
-            earliest_start=earliest_start or (datetime.utcnow() + timedelta(hours=24)),
-            latest_end=latest_end or (datetime.utcnow() + timedelta(days=30))
+            earliest_start=earliest_start or (now + timedelta(hours=24)),
+            latest_end=latest_end or (now + timedelta(days=30))
         )
         
         # Find optimal slots
@@ -627,53 +704,37 @@ async def find_optimal_slots(
         )
         
         # Convert to response format
-        slots_data = []
-        for slot in optimal_slots:
-            slots_data.append({
-                "start_time": slot.start_time.isoformat(),
-                "end_time": slot.end_time.isoformat(),
-                "score": round(slot.score, 3),
-                "conflicts": slot.conflicts,
-                "participants_available": slot.participants_available,
-                "participants_unavailable": slot.participants_unavailable,
-                "reasons": slot.reasons
-            })
-        
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "data": {
-                    "optimal_slots": slots_data,
-                    "request_parameters": {
-                        "candidate_id": candidate_id,
-                        "job_position_id": job_position_id,
-                        "interview_type": interview_type,
-                        "interviewer_emails": interviewer_emails,
-                        "duration_minutes": duration_minutes,
-                        "earliest_start": scheduling_request.earliest_start.isoformat(),
-                        "latest_end": scheduling_request.latest_end.isoformat()
-                    },
-                    "analysis": {
-                        "total_slots_found": len(optimal_slots),
-                        "best_score": optimal_slots[0].score if optimal_slots else 0,
-                        "has_conflict_free_slots": any(not slot.conflicts for slot in optimal_slots)
-                    }
+        slots_data = [slot.to_dict() for slot in optimal_slots]
+        
+        return {
+            "success": True,
+            "data": {
+                "optimal_slots": slots_data,
+                "request_parameters": {
+                    "candidate_id": candidate_id,
+                    "job_position_id": job_position_id,
+                    "interview_type": interview_type,
+                    "interviewer_emails": interviewer_emails,
+                    "duration_minutes": duration_minutes,
+                    "earliest_start": scheduling_request.earliest_start.isoformat(),
+                    "latest_end": scheduling_request.latest_end.isoformat()
+                },
+                "analysis": {
+                    "total_slots_found": len(optimal_slots),
+                    "best_score": optimal_slots[0].score if optimal_slots else 0,
+                    "has_conflict_free_slots": any(not slot.conflicts for slot in optimal_slots)
                 }
             }
-        )
+        }
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"❌ Error finding optimal slots: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/analytics/scheduling", response_model=Dict[str, Any])
 async def get_scheduling_analytics(
     start_date: Optional[datetime] = Query(None, description="Analytics start date"),
     end_date: Optional[datetime] = Query(None, description="Analytics end date"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     📊 Get scheduling analytics and performance metrics
@@ -684,70 +745,83 @@ async def get_scheduling_analytics(
     - Conflict patterns
     - Optimization effectiveness
     """
-    try:
-        # Set default date range
-        if not end_date:
-            end_date = datetime.utcnow()
-        if not start_date:
-            start_date = end_date - timedelta(days=30)
-        
-        # Get scheduling logs
-        logs = db.query(SchedulingLog).filter(
-            SchedulingLog.created_at >= start_date,
-            SchedulingLog.created_at <= end_date
-        ).all()
-        
-        # Calculate analytics
-        total_requests = len(logs)
-        successful_schedules = len([log for log in logs if log.action_status == "success" and log.action_type == "schedule"])
-        failed_schedules = len([log for log in logs if log.action_status == "failed" and log.action_type == "schedule"])
-        reschedules = len([log for log in logs if log.action_type == "reschedule"])
-        
-        # Processing time statistics
-        processing_times = [log.processing_time_ms for log in logs if log.processing_time_ms]
-        avg_processing_time = sum(processing_times) / len(processing_times) if processing_times else 0
-        
-        # Slots evaluation statistics
-        slots_evaluated = [log.slots_evaluated for log in logs if log.slots_evaluated]
-        avg_slots_evaluated = sum(slots_evaluated) / len(slots_evaluated) if slots_evaluated else 0
-        
-        # Success scores
-        success_scores = [log.success_score for log in logs if log.success_score]
-        avg_success_score = sum(success_scores) / len(success_scores) if success_scores else 0
-        
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "data": {
-                    "date_range": {
-                        "start_date": start_date.isoformat(),
-                        "end_date": end_date.isoformat()
-                    },
-                    "summary": {
-                        "total_requests": total_requests,
-                        "successful_schedules": successful_schedules,
-                        "failed_schedules": failed_schedules,
-                        "reschedules": reschedules,
-                        "success_rate": round(successful_schedules / max(1, successful_schedules + failed_schedules) * 100, 2)
-                    },
-                    "performance": {
-                        "avg_processing_time_ms": round(avg_processing_time, 2),
-                        "avg_slots_evaluated": round(avg_slots_evaluated, 2),
-                        "avg_success_score": round(avg_success_score, 3)
-                    },
-                    "trends": {
-                        "daily_schedules": {},  # Could be implemented for daily trends
-                        "common_algorithms": {},  # Could be implemented for algorithm usage
-                        "peak_hours": {}  # Could be implemented for peak scheduling times
-                    }
-                }
+    cache_key = await _get_analytics_cache_key(start_date, end_date)
+    if cache_key:
+        try:
+            cached = await message_broker.redis_client.get(cache_key)
+            if cached:
+                return orjson.loads(cached)
+        except Exception as e:
+            logger.warning("⚠️ Analytics cache read failed: %s", e)
+    
+    # Set default date range
+    if not end_date:
+        end_date = datetime.utcnow()
+    if not start_date:
+        start_date = end_date - timedelta(days=30)
+    
+    # Aggregate scheduling logs in a single query
+    is_schedule = SchedulingLog.action_type == "schedule"
+    stats = (await db.execute(select(
+        func.count().label("total_requests"),
+        func.count().filter(
+            and_(SchedulingLog.action_status == "success", is_schedule)
+        ).label("successful_schedules"),
+        func.count().filter(
+            and_(SchedulingLog.action_status == "failed", is_schedule)
+        ).label("failed_schedules"),
+        func.count().filter(
+            SchedulingLog.action_type == "reschedule"
+        ).label("reschedules"),
+        func.avg(func.nullif(SchedulingLog.processing_time_ms, 0)).label("avg_processing_time"),
+        func.avg(func.nullif(SchedulingLog.slots_evaluated, 0)).label("avg_slots_evaluated"),
+        func.avg(func.nullif(SchedulingLog.success_score, 0)).label("avg_success_score")
+    ).where(
+        SchedulingLog.created_at.between(start_date, end_date)
+    ))).one()
+    
+    total_requests = stats.total_requests
+    successful_schedules = stats.successful_schedules
+    failed_schedules = stats.failed_schedules
+    reschedules = stats.reschedules
+    avg_processing_time = float(stats.avg_processing_time or 0)
+    avg_slots_evaluated = float(stats.avg_slots_evaluated or 0)
+    avg_success_score = float(stats.avg_success_score or 0)
+    
+    analytics = {
+        "success": True,
+        "data": {
+            "date_range": {
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat()
+            },
+            "summary": {
+                "total_requests": total_requests,
+                "successful_schedules": successful_schedules,
+                "failed_schedules": failed_schedules,
+                "reschedules": reschedules,
+                "success_rate": round(successful_schedules / max(1, successful_schedules + failed_schedules) * 100, 2)
+            },
+            "performance": {
+                "avg_processing_time_ms": round(avg_processing_time, 2),
+                "avg_slots_evaluated": round(avg_slots_evaluated, 2),
+                "avg_success_score": round(avg_success_score, 3)
+            },
+            "trends": {
+                "daily_schedules": {},  # Could be implemented for daily trends
+                "common_algorithms": {},  # Could be implemented for algorithm usage
+                "peak_hours": {}  # Could be implemented for peak scheduling times
             }
-        )
-        
-    except Exception as e:
-        logger.error(f"❌ Error fetching scheduling analytics: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        }
+    }
+    
+    if cache_key:
+        try:
+            await message_broker.redis_client.set(cache_key, orjson.dumps(analytics), ex=ANALYTICS_CACHE_TTL)
+        except Exception as e:
+            logger.warning("⚠️ Analytics cache write failed: %s", e)
+    
+    return analytics
 
 # Health check endpoint
 @router.get("/health")
@@ -4,56 +4,348 @@ Handles OpenAI and other AI service integrations
 """
 
 import openai
+import httpx
+import hashlib
+import json
+import msgspec
+import numpy as np
+from cachetools import LRUCache
 from typing import Dict, List, Any, Optional
 import asyncio
+import logging
+import time
 
 # Import settings
 from .config import settings
+from .message_broker import message_broker
+
+logger = logging.getLogger(__name__)
+
+# Resume skill cache: in-process LRU for exact hits, Redis for exact and near-duplicate hits
+RESUME_CACHE_TTL = 86400  # 24 hours
+# Recent resume hashes are indexed in a ZSET scored by insertion time and capped
+# at SEMANTIC_CACHE_MAX_ENTRIES; each vector lives in its own expiring key as
+# packed float32 bytes
+RESUME_EMBEDDINGS_KEY = "resume_embedding_index"
+RESUME_EMBEDDING_PREFIX = "resume_embedding"
+SEMANTIC_CACHE_MAX_ENTRIES = 5000
+# ada-002 scores unrelated resumes around 0.8 and the same resume with light edits
+# (reformatting, a new phone number) at 0.98+, so reuse only near-identical text
+SEMANTIC_CACHE_THRESHOLD = 0.97
+EMBEDDING_MODEL = "text-embedding-ada-002"
+EMBEDDING_MAX_CHARS = 8000
+
+# Skill extraction uses structured outputs, so the model is constrained to
+# this schema at decode time and the reply can be decoded straight into a Struct
+SKILLS_MODEL = "gpt-4o-mini"
+SKILLS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "resume_skills",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "technical_skills": {"type": "array", "items": {"type": "string"}},
+                "soft_skills": {"type": "array", "items": {"type": "string"}},
+                "experience_years": {"type": "number"}
+            },
+            "required": ["technical_skills", "soft_skills", "experience_years"],
+            "additionalProperties": False
+        }
+    }
+}
+
+class ResumeSkills(msgspec.Struct):
+    """Skills extracted from a resume (mirrors SKILLS_RESPONSE_FORMAT)"""
+    technical_skills: List[str]
+    soft_skills: List[str]
+    experience_years: float
+
+_skills_decoder = msgspec.json.Decoder(ResumeSkills)
+
+# The SDK retries 408/409/429/5xx with exponential backoff and jitter (honouring
+# Retry-After); the default of 2 attempts gives up too early under bulk imports
+OPENAI_MAX_RETRIES = 5
+
+# Pooled async clients, one per API key, shared by every caller in the process
+_async_clients: Dict[str, openai.AsyncOpenAI] = {}
+
+def _get_async_client(api_key: str) -> openai.AsyncOpenAI:
+    """Return the pooled AsyncOpenAI client for an API key, creating it on first use"""
+    client = _async_clients.get(api_key)
+    if client is None:
+        client = openai.AsyncOpenAI(
+            api_key=api_key,
+            max_retries=OPENAI_MAX_RETRIES,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+            )
+        )
+        _async_clients[api_key] = client
+    return client
+
+async def warm_async_clients(timeout: float = 3.0) -> None:
+    """
+    Open the TLS connection to the OpenAI API ahead of the first real request
+    
+    Issues a cheap models listing through each pooled client so DNS, TCP and
+    the TLS handshake are paid at startup. Failures are logged and ignored.
+    """
+    if openai_client.available:
+        openai_client.client  # create the pooled client for the configured key
+    
+    async def warm(client: openai.AsyncOpenAI) -> None:
+        try:
+            await asyncio.wait_for(client.models.list(), timeout=timeout)
+        except Exception as e:
+            logger.warning("⚠️  OpenAI connection prewarm failed: %s", e)
+    
+    await asyncio.gather(*(warm(client) for client in _async_clients.values()))
+
+async def close_async_clients() -> None:
+    """Close pooled AsyncOpenAI clients (called on application shutdown)"""
+    for client in _async_clients.values():
+        await client.close()
+    _async_clients.clear()
 
 class OpenAIClient:
     """OpenAI API client for resume analysis"""
     
     def __init__(self):
+        self._skills_cache: LRUCache = LRUCache(maxsize=1024)
+        
         if settings.openai_api_key:
-            self.client = openai.OpenAI(api_key=settings.openai_api_key)
             self.available = True
-            print("✅ OpenAI client initialized")
+            logger.info("✅ OpenAI client initialized")
         else:
             self.available = False
-            print("⚠️  OpenAI API key not configured")
+            logger.warning("⚠️  OpenAI API key not configured")
+    
+    @property
+    def client(self) -> Optional[openai.AsyncOpenAI]:
+        """Shared AsyncOpenAI client, or None when no API key is configured"""
+        if not self.available:
+            return None
+        return _get_async_client(settings.openai_api_key)
     
     async def extract_skills_from_resume(self, resume_text: str) -> Dict[str, Any]:
-        """Extract skills from resume text using GPT-4"""
+        """
+        Extract skills from resume text using SKILLS_MODEL (schema-constrained output)
+        
+        Results are cached by the SHA-256 of the resume text in-process and in
+        Redis; near-duplicate resumes (cosine similarity of their embeddings
+        >= SEMANTIC_CACHE_THRESHOLD) reuse a previously extracted result. An
+        exact-hash miss therefore costs one extra embeddings call before the
+        completion, which is much cheaper than the completion it can save.
+        """
         if not self.available:
             return {"error": "OpenAI client not available"}
         
+        resume_hash = hashlib.sha256(resume_text.encode()).hexdigest()
+        cached = self._skills_cache.get(resume_hash)
+        if cached is not None:
+            return cached
+        
         try:
-            prompt = f"""
-            Extract skills from this resume text:
+            embedding = None
+            cached = await self._get_cached_skills(resume_hash)
+            if cached is None:
+                embedding = await self._embed_resume(resume_text)
+                cached = await self._find_similar_skills(embedding)
+            if cached is not None:
+                self._skills_cache[resume_hash] = cached
+                return cached
             
-            {resume_text}
-            
-            Return JSON with technical_skills, soft_skills, and experience_years.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
+            response = await self.client.chat.completions.create(
+                model=SKILLS_MODEL,
+                messages=[{"role": "user", "content": self._skills_prompt(resume_text)}],
+                response_format=SKILLS_RESPONSE_FORMAT,
                 max_tokens=500
             )
             
-            return {"skills": response.choices[0].message.content}
+            result = {"skills": self._decode_skills(response.choices[0].message.content)}
+            self._skills_cache[resume_hash] = result
+            await self._store_cached_skills(resume_hash, result, embedding)
+            return result
             
         except Exception as e:
             return {"error": str(e)}
     
+    async def _embed_resume(self, resume_text: str) -> Optional[np.ndarray]:
+        """Embed resume text for similarity lookup (None if Redis is unavailable or embedding fails)"""
+        if not message_broker.connected:
+            return None
+        try:
+            response = await self.client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=resume_text[:EMBEDDING_MAX_CHARS]
+            )
+            vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+            return vector / (np.linalg.norm(vector) or 1.0)
+        except Exception as e:
+            logger.warning("⚠️  Resume embedding failed: %s", e)
+            return None
+    
+    async def _get_cached_skills(self, resume_hash: str) -> Optional[Dict[str, Any]]:
+        """Look up an exact cached result in Redis"""
+        if not message_broker.connected:
+            return None
+        try:
+            cached = await message_broker.redis_client.get(f"resume:{resume_hash}")
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning("⚠️  Resume cache lookup failed: %s", e)
+            return None
+    
+    async def _find_similar_skills(self, embedding: Optional[np.ndarray]) -> Optional[Dict[str, Any]]:
+        """Return the cached result of the most similar recent resume above the threshold"""
+        if embedding is None:
+            return None
+        try:
+            redis_client = message_broker.redis_client
+            await redis_client.zremrangebyscore(RESUME_EMBEDDINGS_KEY, '-inf', time.time() - RESUME_CACHE_TTL)
+            hashes = await redis_client.zrevrange(RESUME_EMBEDDINGS_KEY, 0, SEMANTIC_CACHE_MAX_ENTRIES - 1)
+            if not hashes:
+                return None
+            
+            vectors = await message_broker.binary_client.mget(
+                [f"{RESUME_EMBEDDING_PREFIX}:{h}" for h in hashes]
+            )
+            expired = [h for h, vector in zip(hashes, vectors) if vector is None]
+            if expired:
+                await redis_client.zrem(RESUME_EMBEDDINGS_KEY, *expired)
+            
+            live = [(h, vector) for h, vector in zip(hashes, vectors) if vector is not None]
+            if not live:
+                return None
+            
+            matrix = np.frombuffer(b"".join(vector for _, vector in live), dtype=np.float32)
+            similarities = matrix.reshape(len(live), -1) @ embedding
+            best = int(np.argmax(similarities))
+            if similarities[best] < SEMANTIC_CACHE_THRESHOLD:
+                return None
+            
+            return await self._get_cached_skills(live[best][0])
+        except Exception as e:
+            logger.warning("⚠️  Resume similarity lookup failed: %s", e)
+            return None
+    
+    async def _store_cached_skills(self, resume_hash: str, result: Dict[str, Any], embedding: Optional[np.ndarray]) -> None:
+        """Store an extraction result (and its embedding) in Redis"""
+        if not message_broker.connected:
+            return
+        try:
+            await message_broker.redis_client.set(f"resume:{resume_hash}", json.dumps(result), ex=RESUME_CACHE_TTL)
+            if embedding is not None:
+                await message_broker.binary_client.set(
+                    f"{RESUME_EMBEDDING_PREFIX}:{resume_hash}",
+                    embedding.astype(np.float32).tobytes(),
+                    ex=RESUME_CACHE_TTL
+                )
+                async with message_broker.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.zadd(RESUME_EMBEDDINGS_KEY, {resume_hash: time.time()})
+                    # Keep only the newest SEMANTIC_CACHE_MAX_ENTRIES hashes
+                    pipe.zremrangebyrank(RESUME_EMBEDDINGS_KEY, 0, -SEMANTIC_CACHE_MAX_ENTRIES - 1)
+                    await pipe.execute()
+        except Exception as e:
+            logger.warning("⚠️  Resume cache store failed: %s", e)
+    
+    def _skills_prompt(self, resume_text: str) -> str:
+        """Prompt used for resume skill extraction"""
+        return f"""
+            Extract skills from this resume text:
+            
+            {resume_text}
+            
+            Return JSON with technical_skills, soft_skills, and experience_years.
+            """
+    
+    def _decode_skills(self, content: str) -> Dict[str, Any]:
+        """Decode a schema-constrained skills reply into plain JSON-compatible data"""
+        return msgspec.to_builtins(_skills_decoder.decode(content))
+    
+    async def submit_batch(self, requests: List[Dict[str, str]]) -> Optional[str]:
+        """
+        Submit resume skill extraction as an OpenAI Batch job
+        
+        Batch jobs cost half as much as individual completions and do not count
+        against the per-minute rate limits, which suits bulk resume imports.
+        Nothing polls the batch in the background: the caller keeps the returned
+        ID and calls poll_batch() until it completes, then stores the skills.
+        
+        Args:
+            requests: List of {"custom_id": resume_id, "resume_text": text}
+            
+        Returns:
+            Batch ID, or None if the client is unavailable or nothing was submitted
+        """
+        if not self.available or not requests:
+            return None
+        
+        lines = [
+            json.dumps({
+                "custom_id": item["custom_id"],
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": SKILLS_MODEL,
+                    "messages": [{"role": "user", "content": self._skills_prompt(item["resume_text"])}],
+                    "response_format": SKILLS_RESPONSE_FORMAT,
+                    "max_tokens": 500
+                }
+            })
+            for item in requests
+        ]
+        
+        input_file = await self.client.files.create(
+            file=("resume_skills_batch.jsonl", "\n".join(lines).encode()),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        return batch.id
+    
+    async def poll_batch(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Check a batch job and collect its results once complete
+        
+        Returns:
+            {"status": ..., "results": {custom_id: {"skills": ...} or {"error": ...}}}
+        """
+        if not self.available:
+            return {"status": "unavailable", "results": {}}
+        
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status != "completed" or not batch.output_file_id:
+            return {"status": batch.status, "results": {}}
+        
+        content = await self.client.files.content(batch.output_file_id)
+        results = {}
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if item.get("error") or response.get("status_code") != 200:
+                results[item["custom_id"]] = {"error": str(item.get("error") or response.get("body"))}
+            else:
+                results[item["custom_id"]] = {
+                    "skills": self._decode_skills(response["body"]["choices"][0]["message"]["content"])
+                }
+        
+        return {"status": batch.status, "results": results}
+    
     async def extract_skills(self, prompt: str) -> str:
         """Generic skill extraction method for resume analysis"""
         if not self.available:
             return '{"error": "OpenAI client not available"}'
         
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=1500,
@@ -65,21 +357,21 @@ class OpenAIClient:
         except Exception as e:
             return f'{{"error": "{str(e)}"}}'
     
-    def check_connection(self) -> bool:
+    async def check_connection(self) -> bool:
         """Test OpenAI API connection"""
         if not self.available:
             return False
             
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": "Test"}],
                 max_tokens=5
             )
-            print("✅ OpenAI connection successful")
+            logger.info("✅ OpenAI connection successful")
             return True
         except Exception as e:
-            print(f"❌ OpenAI connection failed: {e}")
+            logger.error("❌ OpenAI connection failed: %s", e)
             return False
 
 # Create global AI client instance
@@ -88,5 +380,7 @@ openai_client = OpenAIClient()
 # Create alias for backward compatibility
 ai_client = openai_client
 
-print(f"🤖 AI Clients initialized")
-print(f"   OpenAI: {'✅ Available' if openai_client.available else '❌ Unavailable'}") 
\ No newline at end of file
+logger.info(
+    "🤖 AI Clients initialized (OpenAI: %s)",
+    "✅ Available" if openai_client.available else "❌ Unavailable"
+) 
\ No newline at end of file
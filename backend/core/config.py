@@ -5,6 +5,11 @@ Handles environment variables and application settings
 
 from pydantic_settings import BaseSettings
 from typing import List, Optional
+from functools import lru_cache
+from queue import Queue
+import atexit
+import logging
+import logging.handlers
 import os
 from pathlib import Path
 
@@ -56,6 +61,7 @@ class Settings(BaseSettings):
     max_file_size: int = 10485760  # 10MB in bytes
     allowed_file_types: List[str] = ["pdf", "docx", "doc"]
     upload_folder: str = "./uploads"
+    processed_files_db: str = "./processed_files.db"  # Cloud files already imported
     
     # Resume Processing Configuration
     min_resume_score: int = 50
@@ -65,6 +71,8 @@ class Settings(BaseSettings):
     # Rate Limiting
     rate_limit_per_minute: int = 60
     rate_limit_per_hour: int = 1000
+    webhook_rate_per_second: float = 50.0  # Sustained deliveries accepted per webhook source
+    webhook_burst: int = 200
     
     # CORS
     allowed_origins: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
@@ -76,6 +84,7 @@ class Settings(BaseSettings):
     
     # Performance Settings
     max_concurrent_processing: int = 10
+    db_max_concurrent: int = 6  # Sessions background imports may hold at once
     processing_timeout: int = 300  # 5 minutes
     
     class Config:
@@ -123,7 +132,7 @@ class Settings(BaseSettings):
     def database_url_async(self) -> str:
         """Get asynchronous database URL (for FastAPI)"""
         if "sqlite:" in self.database_url:
-            return self.database_url
+            return self.database_url.replace("sqlite:", "sqlite+aiosqlite:", 1)
         return self.database_url.replace("postgresql://", "postgresql+asyncpg://")
     
     @property
@@ -136,8 +145,42 @@ class Settings(BaseSettings):
         """Check if running in development environment"""
         return self.environment.lower() == "development"
 
-# Create global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the cached application settings
+    
+    Environment parsing, validation and upload folder creation run once per
+    process. Use with FastAPI's Depends() in new code, and call
+    get_settings.cache_clear() to reload (e.g. in tests).
+    """
+    return Settings()
+
+# Global settings instance (kept for existing imports)
+settings = get_settings()
+
+def configure_logging() -> None:
+    """
+    Route all log records through a queue drained by a background thread
+    
+    Callers only enqueue records; the stdout write happens on the listener
+    thread. Runs once per process, before any module calls basicConfig().
+    """
+    root = logging.getLogger()
+    if any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers):
+        return
+    
+    log_queue: Queue = Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.WARNING if settings.is_production else logging.INFO)
+
+configure_logging()
 
 # Print configuration summary
 print(f"🔧 RecruitAI Pro Configuration Loaded")
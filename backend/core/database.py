@@ -3,25 +3,67 @@ Database configuration and setup for RecruitAI Pro
 Handles PostgreSQL connection and SQLAlchemy models
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import asyncio
 import os
+import re
+from contextlib import asynccontextmanager
+from typing import Optional
 
 # Import settings
 from .config import settings
 
+# SQLite connections are local file handles that never go stale, so neither
+# engine pre-pings or recycles them; that is only done for PostgreSQL
+is_sqlite = "sqlite:" in settings.database_url_sync
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.database_url_sync,
-    echo=settings.debug,  # Log SQL queries in debug mode
-    pool_pre_ping=True,   # Verify connections before use
-    pool_recycle=300,     # Recycle connections every 5 minutes
-)
-
-# Create sessionmaker
+if is_sqlite:
+    # SQLite connections are cheap file handles; pooling them only adds contention
+    engine = create_engine(
+        settings.database_url_sync,
+        echo=settings.debug,  # Log SQL queries in debug mode
+        connect_args={"check_same_thread": False},
+        poolclass=NullPool,
+    )
+else:
+    engine = create_engine(
+        settings.database_url_sync,
+        echo=settings.debug,  # Log SQL queries in debug mode
+        pool_size=settings.max_concurrent_processing * 2,
+        max_overflow=20,
+        pool_timeout=30,
+        pool_pre_ping=True,   # Verify connections before use
+        pool_recycle=300,     # Recycle connections every 5 minutes
+        pool_use_lifo=True,   # Reuse warm connections so idle ones can be recycled
+    )
+
+# Create async SQLAlchemy engine for FastAPI handlers
+if is_sqlite:
+    async_engine = create_async_engine(
+        settings.database_url_async,
+        echo=settings.debug,
+        poolclass=NullPool,
+    )
+else:
+    async_engine = create_async_engine(
+        settings.database_url_async,
+        echo=settings.debug,
+        pool_size=settings.max_concurrent_processing * 2,
+        max_overflow=20,
+        pool_timeout=30,
+        pool_pre_ping=True,
+        pool_recycle=300,
+    )
+
+# Create sessionmakers
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
 
 # Create declarative base for models
 Base = declarative_base()
@@ -37,6 +79,33 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """
+    Dependency to get an async database session
+    Used with FastAPI's Depends() in handlers that query the database directly
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Created on first use so it binds to the running event loop
+_import_db_slots: Optional[asyncio.Semaphore] = None
+
+@asynccontextmanager
+async def bounded_async_session():
+    """
+    Open an async session for background import work
+    
+    At most settings.db_max_concurrent of these are open at once, so bulk
+    imports queue in-process instead of draining the pool API requests use.
+    """
+    global _import_db_slots
+    if _import_db_slots is None:
+        _import_db_slots = asyncio.Semaphore(settings.db_max_concurrent)
+    
+    async with _import_db_slots:
+        async with AsyncSessionLocal() as db:
+            yield db
+
 def init_db() -> None:
     """
     Initialize database tables
@@ -61,13 +130,16 @@ def check_db_connection() -> bool:
     try:
         # Test connection
         with engine.connect() as connection:
-            connection.execute("SELECT 1")
+            connection.execute(text("SELECT 1"))
         print("✅ Database connection successful")
         return True
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         return False
 
+# PostgreSQL identifiers can't be bound as parameters, so names are validated first
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
 # Database utilities
 class DatabaseManager:
     """Database management utilities"""
@@ -75,24 +147,34 @@ class DatabaseManager:
     @staticmethod
     def create_database_if_not_exists():
         """Create database if it doesn't exist"""
+        database_name = settings.database_name
+        if not _IDENTIFIER_RE.match(database_name):
+            raise ValueError(f"Invalid database name: {database_name!r}")
+        
         try:
             # Create engine without database name to connect to PostgreSQL server
             db_url_without_db = settings.database_url_sync.rsplit('/', 1)[0]
-            temp_engine = create_engine(db_url_without_db + '/postgres')
+            # CREATE DATABASE cannot run inside a transaction block
+            temp_engine = create_engine(
+                db_url_without_db + '/postgres',
+                isolation_level="AUTOCOMMIT"
+            )
             
             with temp_engine.connect() as conn:
                 # Check if database exists
                 result = conn.execute(
-                    f"SELECT 1 FROM pg_database WHERE datname = '{settings.database_name}'"
+                    text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                    {"name": database_name}
                 )
                 
                 if not result.fetchone():
                     # Create database
-                    conn.execute("COMMIT")  # End any existing transaction
-                    conn.execute(f"CREATE DATABASE {settings.database_name}")
-                    print(f"✅ Created database: {settings.database_name}")
+                    conn.execute(text(f'CREATE DATABASE "{database_name}"'))
+                    print(f"✅ Created database: {database_name}")
                 else:
-                    print(f"📊 Database already exists: {settings.database_name}")
+                    print(f"📊 Database already exists: {database_name}")
+            
+            temp_engine.dispose()
                     
         except Exception as e:
             print(f"❌ Error creating database: {e}")
@@ -123,5 +205,5 @@ print(f"🗄️  Database Configuration:")
 print(f"   Host: {settings.database_host}:{settings.database_port}")
 print(f"   Database: {settings.database_name}")
 print(f"   User: {settings.database_user}")
-print(f"   Connection Pool: Enabled")
+print(f"   Connection Pool: {engine.pool.__class__.__name__}")
 print(f"   Echo SQL: {settings.debug}") 
\ No newline at end of file
@@ -3,39 +3,60 @@ Redis Message Broker for RecruitAI Pro
 Handles inter-agent communication and task queuing
 """
 
-import redis
-import json
+import redis.asyncio as redis
+import orjson
+from cachetools import TTLCache
 import asyncio
-from typing import Dict, Any, Optional, Callable
-from datetime import datetime
+import logging
+import time
+from typing import Dict, Any, Optional, Callable, Set
+from datetime import datetime, timezone
 
 # Import settings
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
+# Naive datetimes are UTC throughout the app; serialize them with a Z suffix
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# Agents that own a task queue
+KNOWN_AGENTS = ("resume_analyzer", "scheduler", "communication")
+
+# Status pages poll get_stats sub-second; serve bursts from a 1s snapshot
+STATS_CACHE_TTL = 1
+
 class MessageBroker:
     """Redis-based message broker for agent communication"""
     
     def __init__(self):
-        try:
-            self.redis_client = redis.Redis(
-                host=settings.redis_host,
-                port=settings.redis_port,
-                db=settings.redis_db,
-                decode_responses=True
-            )
-            # Test connection
-            self.redis_client.ping()
-            self.connected = True
-            print(f"🔗 Connected to Redis: {settings.redis_host}:{settings.redis_port}")
-        except Exception as e:
-            print(f"❌ Redis connection failed: {e}")
-            print("ℹ️  Phase 1: Continuing without Redis - using mock message broker")
-            self.redis_client = None
-            self.connected = False
+        # Connections are opened lazily from the pool; connect() verifies the server
+        self.pool = redis.ConnectionPool(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=settings.redis_db,
+            decode_responses=True,
+            max_connections=100
+        )
+        self.redis_client = redis.Redis(connection_pool=self.pool)
+        # Raw bytes values (e.g. packed float32 vectors) can't go through the decoding client
+        self.binary_pool = redis.ConnectionPool(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=settings.redis_db,
+            decode_responses=False,
+            max_connections=20
+        )
+        self.binary_client = redis.Redis(connection_pool=self.binary_pool)
+        self.connected = False
         
         self.subscribers = {}
+        # Strong references to listener tasks so they aren't garbage collected
+        # mid-flight and can be cancelled on disconnect
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats_cache: TTLCache = TTLCache(maxsize=1, ttl=STATS_CACHE_TTL)
     
-    def publish_message(self, channel: str, message: Dict[str, Any]) -> bool:
+    async def publish_message(self, channel: str, message: Dict[str, Any]) -> bool:
         """
         Publish a message to a channel
         
@@ -48,27 +69,27 @@ class MessageBroker:
         """
         if not self.connected:
             # Mock functionality for Phase 1
-            print(f"📤 [MOCK] Published to '{channel}': {message.get('type', 'unknown')}")
+            logger.debug("📤 [MOCK] Published to '%s': %s", channel, message.get('type', 'unknown'))
             return True
             
         try:
-            # Add metadata to message
+            # Add metadata to message (orjson serializes the datetime natively)
             enriched_message = {
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": datetime.now(timezone.utc),
                 "channel": channel,
                 "data": message
             }
             
             # Publish to Redis
-            result = self.redis_client.publish(channel, json.dumps(enriched_message))
-            print(f"📤 Published to '{channel}': {message.get('type', 'unknown')}")
+            result = await self.redis_client.publish(channel, orjson.dumps(enriched_message, option=ORJSON_OPTIONS))
+            logger.debug("📤 Published to '%s': %s", channel, message.get('type', 'unknown'))
             return result > 0
             
         except Exception as e:
-            print(f"❌ Error publishing message to '{channel}': {e}")
+            logger.error("❌ Error publishing message to '%s': %s", channel, e)
             return False
     
-    def subscribe_to_channel(self, channel: str, callback: Callable) -> None:
+    async def subscribe_to_channel(self, channel: str, callback: Callable) -> None:
         """
         Subscribe to a channel with callback function
         
@@ -78,43 +99,38 @@ class MessageBroker:
         """
         try:
             pubsub = self.redis_client.pubsub()
-            pubsub.subscribe(channel)
+            await pubsub.subscribe(channel)
             
             self.subscribers[channel] = {
                 "pubsub": pubsub,
                 "callback": callback
             }
             
-            print(f"📥 Subscribed to channel: '{channel}'")
+            logger.info("📥 Subscribed to channel: '%s'", channel)
             
             # Start listening in background
-            self._start_listening(channel)
+            task = asyncio.create_task(self._listen(channel, pubsub, callback))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
             
         except Exception as e:
-            print(f"❌ Error subscribing to '{channel}': {e}")
+            logger.error("❌ Error subscribing to '%s': %s", channel, e)
     
-    def _start_listening(self, channel: str) -> None:
-        """Start listening for messages on a channel"""
-        async def listen():
-            pubsub = self.subscribers[channel]["pubsub"]
-            callback = self.subscribers[channel]["callback"]
-            
-            for message in pubsub.listen():
-                if message['type'] == 'message':
-                    try:
-                        # Parse message
-                        data = json.loads(message['data'])
-                        
-                        # Call callback function
-                        await callback(data)
-                        
-                    except Exception as e:
-                        print(f"❌ Error processing message on '{channel}': {e}")
-        
-        # Run listener in background
-        asyncio.create_task(listen())
+    async def _listen(self, channel: str, pubsub, callback: Callable) -> None:
+        """Dispatch messages received on a channel to its callback"""
+        async for message in pubsub.listen():
+            if message['type'] == 'message':
+                try:
+                    # Parse message
+                    data = orjson.loads(message['data'])
+                    
+                    # Call callback function
+                    await callback(data)
+                    
+                except Exception as e:
+                    logger.error("❌ Error processing message on '%s': %s", channel, e)
     
-    def send_to_agent(self, agent_name: str, message_type: str, data: Dict[str, Any]) -> bool:
+    async def send_to_agent(self, agent_name: str, message_type: str, data: Dict[str, Any]) -> bool:
         """
         Send a message to a specific agent
         
@@ -133,9 +149,9 @@ class MessageBroker:
         }
         
         channel = f"agent_{agent_name}"
-        return self.publish_message(channel, message)
+        return await self.publish_message(channel, message)
     
-    def broadcast_status(self, agent_name: str, status: str, details: Dict[str, Any] = None) -> bool:
+    async def broadcast_status(self, agent_name: str, status: str, details: Dict[str, Any] = None) -> bool:
         """
         Broadcast agent status update
         
@@ -152,31 +168,49 @@ class MessageBroker:
             "agent": agent_name,
             "status": status,
             "details": details or {},
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.now(timezone.utc)
         }
         
-        return self.publish_message("agent_status", message)
+        return await self.publish_message("agent_status", message)
     
     async def connect(self):
-        """Async connection method for compatibility"""
-        pass  # Connection already handled in __init__
+        """Verify the Redis server is reachable, falling back to mock mode if not"""
+        try:
+            await self.redis_client.ping()
+            self.connected = True
+            logger.info("🔗 Connected to Redis: %s:%s", settings.redis_host, settings.redis_port)
+        except Exception as e:
+            logger.warning("❌ Redis connection failed: %s", e)
+            logger.warning("ℹ️  Phase 1: Continuing without Redis - using mock message broker")
+            self.connected = False
     
     async def disconnect(self):
         """Async disconnect method"""
-        if self.connected and self.redis_client:
-            self.redis_client.close()
-            print("🔌 Disconnected from Redis")
+        # Stop channel listeners before closing their connections
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        
+        for subscriber in self.subscribers.values():
+            await subscriber["pubsub"].aclose()
+        self.subscribers.clear()
+        
+        await self.redis_client.aclose()
+        await self.binary_client.aclose()
+        if self.connected:
+            self.connected = False
+            logger.info("🔌 Disconnected from Redis")
     
-    def get_agent_queue_size(self, agent_name: str) -> int:
+    async def get_agent_queue_size(self, agent_name: str) -> int:
         """Get the number of pending tasks for an agent"""
         try:
             queue_name = f"queue_{agent_name}"
-            return self.redis_client.llen(queue_name)
+            return await self.redis_client.llen(queue_name)
         except Exception as e:
-            print(f"❌ Error getting queue size for '{agent_name}': {e}")
+            logger.error("❌ Error getting queue size for '%s': %s", agent_name, e)
             return 0
     
-    def add_to_queue(self, agent_name: str, task: Dict[str, Any]) -> bool:
+    async def add_to_queue(self, agent_name: str, task: Dict[str, Any]) -> bool:
         """
         Add a task to an agent's queue
         
@@ -190,68 +224,79 @@ class MessageBroker:
         try:
             queue_name = f"queue_{agent_name}"
             
-            # Add metadata to task
+            # Add metadata to task (orjson serializes the datetime natively)
             enriched_task = {
-                "id": f"{agent_name}_{datetime.utcnow().timestamp()}",
-                "timestamp": datetime.utcnow().isoformat(),
+                "id": f"{agent_name}_{time.time_ns()}",
+                "timestamp": datetime.now(timezone.utc),
                 "agent": agent_name,
                 "task": task
             }
             
             # Add to Redis list (queue)
-            self.redis_client.lpush(queue_name, json.dumps(enriched_task))
-            print(f"📋 Added task to {agent_name} queue")
+            await self.redis_client.lpush(queue_name, orjson.dumps(enriched_task, option=ORJSON_OPTIONS))
+            logger.debug("📋 Added task to %s queue", agent_name)
             return True
             
         except Exception as e:
-            print(f"❌ Error adding task to '{agent_name}' queue: {e}")
+            logger.error("❌ Error adding task to '%s' queue: %s", agent_name, e)
             return False
     
-    def get_next_task(self, agent_name: str) -> Optional[Dict[str, Any]]:
+    async def get_next_task(self, agent_name: str, timeout: int = 5) -> Optional[Dict[str, Any]]:
         """
         Get the next task from an agent's queue
         
+        Blocks inside Redis (BRPOP) until a task arrives or the timeout expires,
+        so workers can loop on this without sleeping between polls.
+        
         Args:
             agent_name: Agent name
+            timeout: Seconds to wait for a task (0 waits indefinitely)
             
         Returns:
-            Dict containing task data or None if queue empty
+            Dict containing task data or None if no task arrived in time
         """
         try:
             queue_name = f"queue_{agent_name}"
             
             # Pop from right (FIFO queue)
-            task_data = self.redis_client.rpop(queue_name)
+            result = await self.redis_client.brpop(queue_name, timeout=timeout)
             
-            if task_data:
-                return json.loads(task_data)
+            if result:
+                _, task_data = result
+                return orjson.loads(task_data)
             return None
             
         except Exception as e:
-            print(f"❌ Error getting task from '{agent_name}' queue: {e}")
+            logger.error("❌ Error getting task from '%s' queue: %s", agent_name, e)
             return None
     
-    def check_connection(self) -> bool:
+    async def check_connection(self) -> bool:
         """Check if Redis connection is working"""
         try:
-            self.redis_client.ping()
-            print("✅ Redis connection successful")
+            await self.redis_client.ping()
+            logger.info("✅ Redis connection successful")
             return True
         except Exception as e:
-            print(f"❌ Redis connection failed: {e}")
+            logger.error("❌ Redis connection failed: %s", e)
             return False
     
-    def get_stats(self) -> Dict[str, Any]:
+    async def get_stats(self) -> Dict[str, Any]:
         """Get Redis and message broker statistics"""
+        cached = self._stats_cache.get("stats")
+        if cached is not None:
+            return cached
+        
         try:
-            info = self.redis_client.info()
+            # Fetch server info and every queue length in a single round-trip
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.info()
+                for agent in KNOWN_AGENTS:
+                    pipe.llen(f"queue_{agent}")
+                info, *queue_sizes = await pipe.execute()
             
-            # Get queue sizes for all agents
-            agent_queues = {}
-            for agent in ['resume_analyzer', 'scheduler', 'communication']:
-                agent_queues[agent] = self.get_agent_queue_size(agent)
+            agent_queues = dict(zip(KNOWN_AGENTS, queue_sizes))
             
-            return {
+            stats = {
                 "connection": "active",
                 "redis_version": info.get("redis_version"),
                 "used_memory": info.get("used_memory_human"),
@@ -259,6 +304,8 @@ class MessageBroker:
                 "agent_queues": agent_queues,
                 "total_pending_tasks": sum(agent_queues.values())
             }
+            self._stats_cache["stats"] = stats
+            return stats
             
         except Exception as e:
             return {
@@ -266,13 +313,10 @@ class MessageBroker:
                 "error": str(e)
             }
 
-# Create global message broker instance
+# Create global message broker instance (connection is verified in connect() at startup)
 message_broker = MessageBroker()
 
-# Check connection on import
-message_broker.check_connection()
-
-print(f"📨 Message Broker initialized")
-print(f"   Redis: {settings.redis_host}:{settings.redis_port}")
-print(f"   Database: {settings.redis_db}")
-print(f"   Status: Ready for inter-agent communication") 
\ No newline at end of file
+logger.info(
+    "📨 Message Broker initialized (Redis: %s:%s, Database: %s)",
+    settings.redis_host, settings.redis_port, settings.redis_db
+) 
\ No newline at end of file
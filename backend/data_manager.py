@@ -11,18 +11,18 @@ Usage:
 import argparse
 import asyncio
 import logging
+import os
+import sys
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-import json
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+import orjson
 
-# Import integration modules
-from integrations.job_boards import job_board_integrator, JobBoardConfig
-from integrations.resume_sources import resume_source_integrator, EmailConfig, CloudStorageConfig
-from integrations.webhooks import webhook_processor
-
-# Import existing sample data generators
-from create_sample_data import create_jobs, create_candidates, create_interviews, create_communications
-from sample_data import fake
+# Integration modules and sample data generators pull in httpx, boto3,
+# OpenAI and faker, so they are imported by the modes that use them
+if TYPE_CHECKING:
+    from integrations.job_boards import JobBoardConfig
 
 # Configure logging
 logging.basicConfig(
@@ -31,16 +31,73 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=1)
+def _demo_job_board_configs() -> Tuple['JobBoardConfig', ...]:
+    """Demo configuration (will fail without real API keys)"""
+    from integrations.job_boards import JobBoardConfig
+    
+    return (
+        JobBoardConfig(
+            name="indeed",
+            api_url="https://api.indeed.com/v1",
+            api_key="demo_key_replace_with_real",
+            company_id="demo_company_id"
+        ),
+    )
+
+def _build_job_board_configs(config: Dict) -> Tuple['JobBoardConfig', ...]:
+    """Build JobBoardConfig instances from the 'job_boards' section of a config"""
+    from integrations.job_boards import JobBoardConfig
+    
+    return tuple(
+        JobBoardConfig(
+            name=cfg['name'],
+            api_url=cfg['api_url'],
+            api_key=cfg['api_key'],
+            company_id=cfg['company_id']
+        )
+        for cfg in config.get('job_boards', [])
+    )
+
+@lru_cache(maxsize=8)
+def _cached_job_board_configs(job_boards_json: bytes) -> Tuple['JobBoardConfig', ...]:
+    """Built configs for a serialized 'job_boards' section, so repeated syncs don't rebuild them"""
+    return _build_job_board_configs({'job_boards': orjson.loads(job_boards_json)})
+
+@lru_cache(maxsize=4)
+def _load_config(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a config file (cached until the file's mtime changes)"""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+def load_config(path: str) -> Dict[str, Any]:
+    """Load a configuration file, reusing the parsed result while it is unchanged"""
+    return _load_config(path, os.path.getmtime(path))
+
+@dataclass
+class DataStats:
+    """Running totals for a data manager session (serialized natively by orjson)"""
+    jobs_created: int = 0
+    candidates_created: int = 0
+    interviews_created: int = 0
+    communications_sent: int = 0
+    errors: List[str] = field(default_factory=list)
+
 class DataManager:
     """Unified data management system"""
     
     def __init__(self):
-        self.stats = {
-            'jobs_created': 0,
-            'candidates_created': 0,
-            'interviews_created': 0,
-            'communications_sent': 0,
-            'errors': []
+        # Counters are only updated between awaits, so concurrent sources
+        # on the one event loop can't interleave an increment
+        self.stats = DataStats()
+        
+        # Real data sources by name
+        self.integrations = {
+            'job_boards': self._integrate_job_boards,
+            'email': self._integrate_email_resumes,
+            'cloud_storage': self._integrate_cloud_storage,
+            'webhooks': self._setup_webhooks,
+            'all': self._integrate_all_sources
         }
     
     async def run_real_data_integration(self, source: str, config: Optional[Dict] = None) -> Dict[str, Any]:
@@ -48,22 +105,15 @@ class DataManager:
         logger.info(f"🔄 Starting real data integration from {source}")
         
         try:
-            if source == 'job_boards':
-                return await self._integrate_job_boards(config)
-            elif source == 'email':
-                return await self._integrate_email_resumes(config)
-            elif source == 'cloud_storage':
-                return await self._integrate_cloud_storage(config)
-            elif source == 'webhooks':
-                return await self._setup_webhooks(config)
-            elif source == 'all':
-                return await self._integrate_all_sources(config)
-            else:
+            integration_func = self.integrations.get(source)
+            if not integration_func:
                 raise ValueError(f"Unknown source: {source}")
+            
+            return await integration_func(config)
                 
         except Exception as e:
             logger.error(f"❌ Real data integration failed: {str(e)}")
-            self.stats['errors'].append(f"Real data integration: {str(e)}")
+            self.stats.errors.append(f"Real data integration: {str(e)}")
             return {'success': False, 'error': str(e)}
     
     async def run_fake_data_generation(self, count: int = 10) -> Dict[str, Any]:
@@ -71,21 +121,23 @@ class DataManager:
         logger.info(f"🎭 Generating {count} fake data records")
         
         try:
+            from create_sample_data import create_jobs, create_candidates, create_interviews, create_communications
+            
             # Generate jobs
             jobs_result = await create_jobs(count // 2)
-            self.stats['jobs_created'] += jobs_result.get('created', 0)
+            self.stats.jobs_created += jobs_result.get('created', 0)
             
             # Generate candidates
             candidates_result = await create_candidates(count)
-            self.stats['candidates_created'] += candidates_result.get('created', 0)
+            self.stats.candidates_created += candidates_result.get('created', 0)
             
             # Generate interviews
             interviews_result = await create_interviews(count // 3)
-            self.stats['interviews_created'] += interviews_result.get('created', 0)
+            self.stats.interviews_created += interviews_result.get('created', 0)
             
             # Generate communications
             comms_result = await create_communications(count // 2)
-            self.stats['communications_sent'] += comms_result.get('sent', 0)
+            self.stats.communications_sent += comms_result.get('sent', 0)
             
             logger.info(f"✅ Fake data generation completed")
             
@@ -97,40 +149,26 @@ class DataManager:
             
         except Exception as e:
             logger.error(f"❌ Fake data generation failed: {str(e)}")
-            self.stats['errors'].append(f"Fake data generation: {str(e)}")
+            self.stats.errors.append(f"Fake data generation: {str(e)}")
             return {'success': False, 'error': str(e)}
     
     async def _integrate_job_boards(self, config: Optional[Dict] = None) -> Dict[str, Any]:
         """Integrate with job boards"""
         logger.info("🔍 Integrating with job boards")
+        from integrations.job_boards import job_board_integrator
         
-        # Use provided config or defaults
+        # Use provided config or defaults; the config dict may be the shared
+        # cached result of load_config, so it is only read here
         if config:
-            job_configs = [
-                JobBoardConfig(
-                    name=cfg['name'],
-                    api_url=cfg['api_url'],
-                    api_key=cfg['api_key'],
-                    company_id=cfg['company_id']
-                )
-                for cfg in config.get('job_boards', [])
-            ]
+            job_configs = _cached_job_board_configs(orjson.dumps(config.get('job_boards', [])))
         else:
-            # Demo configuration (will fail without real API keys)
-            job_configs = [
-                JobBoardConfig(
-                    name="indeed",
-                    api_url="https://api.indeed.com/v1",
-                    api_key="demo_key_replace_with_real",
-                    company_id="demo_company_id"
-                )
-            ]
+            job_configs = _demo_job_board_configs()
         
         result = await job_board_integrator.sync_jobs_from_all_boards(job_configs)
         
         # Update stats
         for board_result in result.values():
-            self.stats['jobs_created'] += board_result.get('jobs_created', 0)
+            self.stats.jobs_created += board_result.get('jobs_created', 0)
         
         return {
             'success': True,
@@ -142,6 +180,7 @@ class DataManager:
     async def _integrate_email_resumes(self, config: Optional[Dict] = None) -> Dict[str, Any]:
         """Integrate with email resume processing"""
         logger.info("📧 Integrating with email resume processing")
+        from integrations.resume_sources import resume_source_integrator, EmailConfig
         
         # Use provided config or defaults
         if config and 'email' in config:
@@ -158,7 +197,7 @@ class DataManager:
         result = await resume_source_integrator.process_email_resumes(email_config)
         
         # Update stats
-        self.stats['candidates_created'] += result.get('processed_count', 0)
+        self.stats.candidates_created += result.get('processed_count', 0)
         
         return {
             'success': result.get('success', False),
@@ -170,6 +209,7 @@ class DataManager:
     async def _integrate_cloud_storage(self, config: Optional[Dict] = None) -> Dict[str, Any]:
         """Integrate with cloud storage resume processing"""
         logger.info("☁️ Integrating with cloud storage")
+        from integrations.resume_sources import resume_source_integrator, CloudStorageConfig
         
         # Use provided config or defaults
         if config and 'cloud_storage' in config:
@@ -188,7 +228,7 @@ class DataManager:
         result = await resume_source_integrator.process_cloud_storage_resumes(cloud_config)
         
         # Update stats
-        self.stats['candidates_created'] += result.get('processed_count', 0)
+        self.stats.candidates_created += result.get('processed_count', 0)
         
         return {
             'success': result.get('success', False),
@@ -231,31 +271,20 @@ class DataManager:
         """Integrate with all available sources"""
         logger.info("🔄 Integrating with all sources")
         
-        results = {}
-        
-        # Job boards
-        try:
-            results['job_boards'] = await self._integrate_job_boards(config)
-        except Exception as e:
-            results['job_boards'] = {'success': False, 'error': str(e)}
-        
-        # Email resumes
-        try:
-            results['email'] = await self._integrate_email_resumes(config)
-        except Exception as e:
-            results['email'] = {'success': False, 'error': str(e)}
-        
-        # Cloud storage
-        try:
-            results['cloud_storage'] = await self._integrate_cloud_storage(config)
-        except Exception as e:
-            results['cloud_storage'] = {'success': False, 'error': str(e)}
-        
-        # Webhooks
-        try:
-            results['webhooks'] = await self._setup_webhooks(config)
-        except Exception as e:
-            results['webhooks'] = {'success': False, 'error': str(e)}
+        # The sources are independent, so run them concurrently
+        sources = ['job_boards', 'email', 'cloud_storage', 'webhooks']
+        outcomes = await asyncio.gather(
+            self._integrate_job_boards(config),
+            self._integrate_email_resumes(config),
+            self._integrate_cloud_storage(config),
+            self._setup_webhooks(config),
+            return_exceptions=True
+        )
+        
+        results = {
+            source: {'success': False, 'error': str(outcome)} if isinstance(outcome, Exception) else outcome
+            for source, outcome in zip(sources, outcomes)
+        }
         
         return {
             'success': True,
@@ -263,7 +292,18 @@ class DataManager:
             'results': results,
             'total_stats': self.stats
         }
-    
+
+    async def close(self) -> None:
+        """Shut down the integrations this session imported"""
+        job_boards = sys.modules.get('integrations.job_boards')
+        if job_boards is not None:
+            await job_boards.job_board_integrator.close()
+        
+        # Imported candidates are still being analyzed in the background
+        resume_sources = sys.modules.get('integrations.resume_sources')
+        if resume_sources is not None:
+            await resume_sources.resume_source_integrator.close()
+
     def get_status(self) -> Dict[str, Any]:
         """Get current system status and data counts"""
         logger.info("📊 Getting system status")
@@ -303,13 +343,13 @@ class DataManager:
         """Get recommendations for data management"""
         recommendations = []
         
-        if self.stats['jobs_created'] == 0:
+        if self.stats.jobs_created == 0:
             recommendations.append("Consider adding job positions to improve candidate matching")
         
-        if self.stats['candidates_created'] == 0:
+        if self.stats.candidates_created == 0:
             recommendations.append("Add candidate data via real integrations or sample data")
         
-        if len(self.stats['errors']) > 0:
+        if len(self.stats.errors) > 0:
             recommendations.append("Review and fix integration errors")
         
         recommendations.append("Set up scheduled data synchronization for production")
@@ -374,8 +414,7 @@ async def main():
     config = None
     if args.config:
         try:
-            with open(args.config, 'r') as f:
-                config = json.load(f)
+            config = load_config(args.config)
         except Exception as e:
             logger.error(f"Failed to load config file: {str(e)}")
             return
@@ -386,16 +425,25 @@ async def main():
             logger.error("--source is required for real mode")
             return
         
-        result = await data_manager.run_real_data_integration(args.source, config)
-        print(json.dumps(result, indent=2))
+        try:
+            result = await data_manager.run_real_data_integration(args.source, config)
+        finally:
+            await data_manager.close()
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
         
     elif args.mode == 'fake':
         result = await data_manager.run_fake_data_generation(args.count)
-        print(json.dumps(result, indent=2))
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
         
     elif args.mode == 'status':
         status = data_manager.get_status()
-        print(json.dumps(status, indent=2))
+        print(orjson.dumps(status, option=orjson.OPT_INDENT_2).decode())
 
 if __name__ == "__main__":
+    # uvloop cuts per-call event loop overhead for the concurrent HTTP/IMAP/S3 work
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
     asyncio.run(main()) 
\ No newline at end of file
@@ -3,20 +3,38 @@ Job Board Integrations for RecruitAI Pro
 Connect to real job posting platforms and ATS systems
 """
 
-import requests
+import httpx
+import ijson
 import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Optional, Any, AsyncIterator, Sequence
 from dataclasses import dataclass
+from urllib.parse import urlparse
 import logging
 
-from core.database import get_db
+from sqlalchemy import insert, select
+
+from core.database import bounded_async_session
 from models.jobs import JobPosition
 from models.candidates import Candidate
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Transient failures worth retrying (rate limiting and gateway/server errors)
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+RETRY_JITTER = 0.5
+
+# Jobs are parsed incrementally from the response body and written in batches
+IMPORT_BATCH_SIZE = 500
+IMPORT_QUEUE_SIZE = IMPORT_BATCH_SIZE * 2
+
+@dataclass(frozen=True)
 class JobBoardConfig:
     """Configuration for job board integrations"""
     name: str
@@ -26,6 +44,94 @@ class JobBoardConfig:
     enabled: bool = True
     sync_interval_hours: int = 24
 
+def _parse_retry_after(value: str) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds"""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class HostRateLimiter:
+    """
+    Token bucket for a single job board host
+    
+    Requests are paced below the host's quoted limit instead of being fired
+    until a 429 comes back. The refill rate follows the X-RateLimit-Remaining /
+    X-RateLimit-Reset headers, and Retry-After pauses the bucket outright.
+    """
+    
+    def __init__(self, requests_per_second: float = 5.0, burst: int = 5, max_concurrency: int = 8):
+        self.default_rate = requests_per_second
+        self.rate = requests_per_second
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+    
+    @asynccontextmanager
+    async def acquire(self):
+        """Wait for a concurrency slot and a token before issuing a request"""
+        async with self._semaphore:
+            await self._take_token()
+            yield
+    
+    async def _take_token(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    def update_from_response(self, response: httpx.Response) -> None:
+        """Adjust pacing from the rate limit headers of a response"""
+        now = time.monotonic()
+        headers = response.headers
+        
+        retry_after = headers.get('Retry-After')
+        if response.status_code == 429 or retry_after:
+            delay = _parse_retry_after(retry_after) if retry_after else None
+            self.blocked_until = max(self.blocked_until, now + (delay if delay is not None else 1.0 / self.rate))
+            self.tokens = 0.0
+            return
+        
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None:
+            return
+        try:
+            remaining = int(remaining)
+            reset_seconds = float(headers.get('X-RateLimit-Reset', 0))
+        except ValueError:
+            return
+        
+        # X-RateLimit-Reset is either seconds until reset or an epoch timestamp
+        if reset_seconds > time.time():
+            reset_seconds -= time.time()
+        
+        if remaining <= 0 and reset_seconds > 0:
+            self.blocked_until = max(self.blocked_until, now + reset_seconds)
+            self.tokens = 0.0
+        elif reset_seconds > 0:
+            # Spread the remaining quota over the rest of the window
+            self.rate = min(self.default_rate, max(remaining / reset_seconds, 0.1))
+        else:
+            self.rate = self.default_rate
+
 class JobBoardIntegrator:
     """Handles integration with multiple job boards"""
     
@@ -36,24 +142,184 @@ class JobBoardIntegrator:
             'glassdoor': self._glassdoor_integration,
             'workday': self._workday_integration
         }
+        
+        # One token bucket per job board host
+        self.rate_limiters: Dict[str, HostRateLimiter] = {}
+        
+        # Shared keep-alive pool for every job board request (created on first use)
+        self._client: Optional[httpx.AsyncClient] = None
     
-    async def sync_jobs_from_all_boards(self, configs: List[JobBoardConfig]) -> Dict[str, Any]:
-        """Sync jobs from all configured job boards"""
-        results = {}
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client; negotiates HTTP/2 where the board supports it"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=30,
+                limits=httpx.Limits(
+                    max_connections=128,
+                    max_keepalive_connections=64,
+                    keepalive_expiry=60
+                )
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        """Close the shared HTTP connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _get_rate_limiter(self, config: JobBoardConfig) -> HostRateLimiter:
+        """Get the rate limiter for a job board's API host"""
+        host = urlparse(config.api_url).netloc
+        limiter = self.rate_limiters.get(host)
+        if limiter is None:
+            limiter = self.rate_limiters[host] = HostRateLimiter()
+        return limiter
+    
+    async def _request_with_retry(
+        self,
+        config: JobBoardConfig,
+        method: str,
+        url: str,
+        *,
+        max_retries: int = 5,
+        stream: bool = False,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Issue a request against a job board, retrying transient failures
         
-        for config in configs:
-            if not config.enabled:
-                continue
-                
+        Each attempt is paced by the host's rate limiter. 429/5xx responses and
+        connection errors are retried with exponential backoff plus jitter,
+        preferring the server's Retry-After when it sends one.
+        
+        Args:
+            stream: Return before reading the body; the caller must aclose() it
+        
+        Returns:
+            The final response (which may still be an error after max_retries)
+        """
+        limiter = self._get_rate_limiter(config)
+        
+        for attempt in range(max_retries + 1):
             try:
-                logger.info(f"🔄 Syncing jobs from {config.name}")
-                result = await self._sync_from_board(config)
-                results[config.name] = result
-                logger.info(f"✅ {config.name}: {result['jobs_created']} jobs created")
+                async with limiter.acquire():
+                    request = self.client.build_request(method, url, **kwargs)
+                    response = await self.client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                if attempt == max_retries:
+                    raise
+                delay = None
+                logger.warning("⚠️  %s request failed (%s), retrying", config.name, e)
+            else:
+                limiter.update_from_response(response)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt == max_retries:
+                    return response
                 
-            except Exception as e:
-                logger.error(f"❌ Error syncing from {config.name}: {str(e)}")
-                results[config.name] = {'error': str(e), 'jobs_created': 0}
+                await response.aclose()
+                retry_after = response.headers.get('Retry-After')
+                delay = _parse_retry_after(retry_after) if retry_after else None
+                logger.warning("⚠️  %s returned %s, retrying", config.name, response.status_code)
+            
+            if delay is None:
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) + random.uniform(0, RETRY_JITTER)
+            await asyncio.sleep(delay)
+    
+    async def _stream_jobs(
+        self,
+        config: JobBoardConfig,
+        url: str,
+        prefix: str,
+        error_label: str,
+        **kwargs
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield job dicts from a board's JSON response as the body arrives
+        
+        Args:
+            prefix: ijson path of the job objects ('item' for a top-level array)
+            error_label: Prefix for the error raised on a non-200 response
+        """
+        response = await self._request_with_retry(config, "GET", url, stream=True, **kwargs)
+        try:
+            if response.status_code != 200:
+                raise Exception(f"{error_label}: {response.status_code}")
+            
+            jobs = ijson.sendable_list()
+            parser = ijson.items_coro(jobs, prefix, use_float=True)
+            async for chunk in response.aiter_bytes():
+                parser.send(chunk)
+                for job in jobs:
+                    yield job
+                del jobs[:]
+            parser.close()
+            for job in jobs:
+                yield job
+        finally:
+            await response.aclose()
+    
+    async def _import_jobs(
+        self,
+        config: JobBoardConfig,
+        source: str,
+        url: str,
+        prefix: str = 'item',
+        error_label: str = "API error",
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Stream a board's jobs into the database
+        
+        This coroutine fetches, parses and transforms jobs and hands the rows
+        to a single writer task over a bounded queue, so database writes for
+        one batch overlap with downloading the next.
+        """
+        commit_queue: asyncio.Queue = asyncio.Queue(maxsize=IMPORT_QUEUE_SIZE)
+        writer = asyncio.create_task(self._write_jobs(commit_queue, source))
+        total_found = 0
+        
+        try:
+            async for job_data in self._stream_jobs(config, url, prefix, error_label, **kwargs):
+                total_found += 1
+                try:
+                    # Transform external data to internal format
+                    job_row = self._transform_job_data(job_data, source)
+                except Exception as e:
+                    logger.error("Error creating job from %s: %s", source, e)
+                    continue
+                await commit_queue.put(job_row)
+        finally:
+            await commit_queue.put(None)  # Tell the writer no more rows are coming
+            created_count = await writer
+        
+        return {
+            'success': True,
+            'jobs_created': created_count,
+            'total_found': total_found
+        }
+    
+    async def sync_jobs_from_all_boards(self, configs: Sequence[JobBoardConfig]) -> Dict[str, Any]:
+        """Sync jobs from all configured job boards concurrently"""
+        enabled_configs = [config for config in configs if config.enabled]
+        
+        for config in enabled_configs:
+            logger.info("🔄 Syncing jobs from %s", config.name)
+        
+        outcomes = await asyncio.gather(
+            *(self._sync_from_board(config) for config in enabled_configs),
+            return_exceptions=True
+        )
+        
+        results = {}
+        for config, result in zip(enabled_configs, outcomes):
+            if isinstance(result, Exception):
+                logger.error("❌ Error syncing from %s: %s", config.name, result)
+                results[config.name] = {'error': str(result), 'jobs_created': 0}
+            else:
+                results[config.name] = result
+                logger.info("✅ %s: %s jobs created", config.name, result['jobs_created'])
         
         return results
     
@@ -82,26 +348,16 @@ class JobBoardIntegrator:
                 'posted_since': (datetime.now() - timedelta(hours=24)).isoformat()
             }
             
-            response = requests.get(
+            return await self._import_jobs(
+                config,
+                'indeed',
                 f"{config.api_url}/jobs",
                 headers=headers,
-                params=params,
-                timeout=30
+                params=params
             )
-            
-            if response.status_code == 200:
-                jobs_data = response.json()
-                created_count = await self._create_jobs_from_data(jobs_data, 'indeed')
-                return {
-                    'success': True,
-                    'jobs_created': created_count,
-                    'total_found': len(jobs_data)
-                }
-            else:
-                raise Exception(f"API error: {response.status_code}")
                 
         except Exception as e:
-            logger.error(f"Indeed integration error: {str(e)}")
+            logger.error("Indeed integration error: %s", e)
             return {'success': False, 'error': str(e), 'jobs_created': 0}
     
     async def _linkedin_integration(self, config: JobBoardConfig) -> Dict[str, Any]:
@@ -115,26 +371,18 @@ class JobBoardIntegrator:
             }
             
             # Get company job postings
-            response = requests.get(
+            return await self._import_jobs(
+                config,
+                'linkedin',
                 f"{config.api_url}/jobPostings",
+                prefix='elements.item',
+                error_label="LinkedIn API error",
                 headers=headers,
-                params={'company': config.company_id},
-                timeout=30
+                params={'company': config.company_id}
             )
-            
-            if response.status_code == 200:
-                jobs_data = response.json()['elements']
-                created_count = await self._create_jobs_from_data(jobs_data, 'linkedin')
-                return {
-                    'success': True,
-                    'jobs_created': created_count,
-                    'total_found': len(jobs_data)
-                }
-            else:
-                raise Exception(f"LinkedIn API error: {response.status_code}")
                 
         except Exception as e:
-            logger.error(f"LinkedIn integration error: {str(e)}")
+            logger.error("LinkedIn integration error: %s", e)
             return {'success': False, 'error': str(e), 'jobs_created': 0}
     
     async def _glassdoor_integration(self, config: JobBoardConfig) -> Dict[str, Any]:
@@ -146,25 +394,16 @@ class JobBoardIntegrator:
                 'Content-Type': 'application/json'
             }
             
-            response = requests.get(
+            return await self._import_jobs(
+                config,
+                'glassdoor',
                 f"{config.api_url}/employer/{config.company_id}/jobs",
-                headers=headers,
-                timeout=30
+                error_label="Glassdoor API error",
+                headers=headers
             )
-            
-            if response.status_code == 200:
-                jobs_data = response.json()
-                created_count = await self._create_jobs_from_data(jobs_data, 'glassdoor')
-                return {
-                    'success': True,
-                    'jobs_created': created_count,
-                    'total_found': len(jobs_data)
-                }
-            else:
-                raise Exception(f"Glassdoor API error: {response.status_code}")
                 
         except Exception as e:
-            logger.error(f"Glassdoor integration error: {str(e)}")
+            logger.error("Glassdoor integration error: %s", e)
             return {'success': False, 'error': str(e), 'jobs_created': 0}
     
     async def _workday_integration(self, config: JobBoardConfig) -> Dict[str, Any]:
@@ -176,62 +415,78 @@ class JobBoardIntegrator:
                 'Content-Type': 'application/json'
             }
             
-            response = requests.get(
+            return await self._import_jobs(
+                config,
+                'workday',
                 f"{config.api_url}/recruiting/jobRequisitions",
+                error_label="Workday API error",
                 headers=headers,
-                params={'company': config.company_id},
-                timeout=30
+                params={'company': config.company_id}
             )
-            
-            if response.status_code == 200:
-                jobs_data = response.json()
-                created_count = await self._create_jobs_from_data(jobs_data, 'workday')
-                return {
-                    'success': True,
-                    'jobs_created': created_count,
-                    'total_found': len(jobs_data)
-                }
-            else:
-                raise Exception(f"Workday API error: {response.status_code}")
                 
         except Exception as e:
-            logger.error(f"Workday integration error: {str(e)}")
+            logger.error("Workday integration error: %s", e)
             return {'success': False, 'error': str(e), 'jobs_created': 0}
     
-    async def _create_jobs_from_data(self, jobs_data: List[Dict], source: str) -> int:
-        """Create job positions from external data"""
+    async def _write_jobs(self, commit_queue: asyncio.Queue, source: str) -> int:
+        """
+        Drain transformed job rows from the queue and insert them
+        
+        Writes up to IMPORT_BATCH_SIZE rows at a time, flushing early whenever
+        the queue runs dry. Stops at the None sentinel.
+        
+        Returns:
+            Number of job positions created
+        """
         created_count = 0
+        batch = []
         
-        async with get_db() as db:
-            for job_data in jobs_data:
+        while True:
+            job_row = await commit_queue.get()
+            if job_row is not None:
+                batch.append(job_row)
+            
+            if batch and (job_row is None or len(batch) >= IMPORT_BATCH_SIZE or commit_queue.empty()):
                 try:
-                    # Transform external data to internal format
-                    job_position = self._transform_job_data(job_data, source)
-                    
-                    # Check if job already exists
-                    existing = db.query(JobPosition).filter(
-                        JobPosition.title == job_position.title,
-                        JobPosition.department == job_position.department
-                    ).first()
-                    
-                    if not existing:
-                        db.add(job_position)
-                        created_count += 1
-                        
+                    created_count += await self._create_jobs_from_rows(batch)
                 except Exception as e:
-                    logger.error(f"Error creating job from {source}: {str(e)}")
-                    continue
+                    logger.error("Error saving jobs from %s: %s", source, e)
+                batch = []
+            
+            if job_row is None:
+                return created_count
+    
+    async def _create_jobs_from_rows(self, incoming: List[Dict[str, Any]]) -> int:
+        """Insert the job rows that don't already exist"""
+        async with bounded_async_session() as db:
+            # Check every incoming job against existing ones in a single query
+            result = await db.execute(
+                select(JobPosition.title, JobPosition.department).where(
+                    JobPosition.title.in_({job['title'] for job in incoming})
+                )
+            )
+            existing = {tuple(row) for row in result}
+            
+            new_jobs = []
+            for job_row in incoming:
+                key = (job_row['title'], job_row['department'])
+                if key not in existing:
+                    existing.add(key)  # Also skip duplicates within this batch
+                    new_jobs.append(job_row)
             
-            db.commit()
+            if new_jobs:
+                # One executemany for the whole batch instead of an ORM add per job
+                await db.execute(insert(JobPosition), new_jobs)
+                await db.commit()
         
-        return created_count
+        return len(new_jobs)
     
-    def _transform_job_data(self, job_data: Dict, source: str) -> JobPosition:
-        """Transform external job data to internal JobPosition format"""
+    def _transform_job_data(self, job_data: Dict, source: str) -> Dict[str, Any]:
+        """Transform external job data to a JobPosition row mapping"""
         # This would need to be customized per integration
         # Here's a generic transformation
         
-        return JobPosition(
+        return dict(
             title=job_data.get('title', ''),
             department=job_data.get('department', 'Unknown'),
             location=job_data.get('location', 'Remote'),
@@ -248,7 +503,7 @@ class JobBoardIntegrator:
         )
 
 # Example usage configuration
-EXAMPLE_CONFIGS = [
+EXAMPLE_CONFIGS = (
     JobBoardConfig(
         name="indeed",
         api_url="https://api.indeed.com/v1",
@@ -267,7 +522,7 @@ EXAMPLE_CONFIGS = [
         api_key="your_workday_api_key",
         company_id="your_company_id"
     )
-]
+)
 
 # Initialize integrator
 job_board_integrator = JobBoardIntegrator()
@@ -279,6 +534,6 @@ async def scheduled_job_sync():
     results = await job_board_integrator.sync_jobs_from_all_boards(EXAMPLE_CONFIGS)
     
     total_created = sum(result.get('jobs_created', 0) for result in results.values())
-    logger.info(f"✅ Scheduled sync completed: {total_created} jobs created")
+    logger.info("✅ Scheduled sync completed: %s jobs created", total_created)
     
     return results 
\ No newline at end of file
@@ -3,37 +3,179 @@ Resume Source Integrations for RecruitAI Pro
 Automatically process resumes from emails, cloud storage, and web forms
 """
 
-import os
+import io
 import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any, Union
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, List, Dict, Optional, Any, Tuple, Union
 from dataclasses import dataclass
 import logging
-import tempfile
+import re
+import socket
+import sqlite3
+import threading
 from pathlib import Path
 
 # Email processing
-import imaplib
+import aioimaplib
 import email
+import email.message
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
-# Cloud storage
-import boto3
-from google.cloud import storage as gcs
-from dropbox import Dropbox
+# Cloud storage SDKs (boto3, google-cloud-storage, dropbox) are heavy, so each
+# is imported by the provider method that uses it
 
 # Web processing
 import requests
 from fastapi import UploadFile
+from sqlalchemy import select
 
-from core.database import get_db
+from core.config import settings
+from core.database import bounded_async_session
+from integrations.job_boards import HostRateLimiter
 from models.candidates import Candidate
-from services.file_processor import file_processor
+from services.file_processor import file_processor, EMAIL_RE
 from agents.resume_analyzer import resume_analyzer
 
 logger = logging.getLogger(__name__)
 
+# Servers drop IDLE after 30 minutes (RFC 2177), so re-issue it just before
+IMAP_IDLE_TIMEOUT = 1740
+
+# Messages requested per UID FETCH, so a backlog costs one round trip per batch
+EMAIL_FETCH_BATCH_SIZE = 50
+_FETCH_UID_RE = re.compile(rb'UID (\d+)')
+
+# Encoded attachments larger than this are decoded on a worker thread
+ATTACHMENT_DECODE_OFFLOAD_SIZE = 64 * 1024
+
+# A resume's first line is usually the candidate's name: 2-4 words of letters
+_NAME_LINE_RE = re.compile(r"^[^\W\d_]+(?:[ .'-]+[^\W\d_]+){1,3}$")
+
+# Large S3 objects are fetched as parallel 8 MB byte-range GETs, and several
+# objects are downloaded at once (analysis is bounded separately, by
+# settings.max_concurrent_processing)
+S3_PART_SIZE = 8 * 1024 * 1024
+S3_PART_CONCURRENCY = 16
+S3_MAX_CONCURRENT_DOWNLOADS = 16
+
+# Imported candidates are inserted together: a batch is written when this many
+# are waiting, or this many seconds after the first one arrives
+CANDIDATE_BATCH_SIZE = 100
+CANDIDATE_BATCH_DELAY = 0.05
+
+# Background resume analyses are paced so a large import doesn't burst into
+# the LLM API's rate limit (transient 429s are retried by the OpenAI client)
+ANALYSIS_REQUESTS_PER_SECOND = 2.0
+
+# GCS blobs are downloaded together by the SDK's transfer manager thread pool
+GCS_MAX_CONCURRENT_DOWNLOADS = 16
+
+class _BytesUploadFile:
+    """Minimal UploadFile stand-in for resume bytes fetched by an integration"""
+    
+    def __init__(self, filename: str, content: bytes):
+        self.filename = filename
+        self.content = content
+        self.size = len(content)
+        self.content_type = None
+    
+    async def read(self) -> bytes:
+        return self.content
+
+class ProcessedFileStore:
+    """
+    Cloud files that have already been imported, persisted in SQLite
+    
+    Each file is recorded with its version (S3 ETag, GCS generation, Dropbox
+    rev), so later runs - including after a restart - skip unchanged files
+    without downloading them, while modified ones are imported again.
+    
+    sqlite3 blocks, so the public methods run their queries on a worker
+    thread; a lock serializes them on the shared connection.
+    """
+    
+    # Keys per IN (...) lookup, under SQLite's bound parameter limit
+    LOOKUP_CHUNK_SIZE = 500
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS processed_files ("
+                "provider TEXT NOT NULL, bucket TEXT NOT NULL, key TEXT NOT NULL, "
+                "version TEXT, processed_at TEXT NOT NULL, "
+                "PRIMARY KEY (provider, bucket, key))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS listing_markers ("
+                "provider TEXT NOT NULL, bucket TEXT NOT NULL, prefix TEXT NOT NULL, "
+                "last_key TEXT NOT NULL, PRIMARY KEY (provider, bucket, prefix))"
+            )
+        return self._conn
+    
+    async def versions(self, provider: str, bucket: str, keys: List[str]) -> Dict[str, Optional[str]]:
+        """Return the imported version of each of the given keys that has been recorded"""
+        return await asyncio.to_thread(self._versions, provider, bucket, keys)
+    
+    def _versions(self, provider: str, bucket: str, keys: List[str]) -> Dict[str, Optional[str]]:
+        versions = {}
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(keys), self.LOOKUP_CHUNK_SIZE):
+                chunk = keys[start:start + self.LOOKUP_CHUNK_SIZE]
+                rows = conn.execute(
+                    "SELECT key, version FROM processed_files WHERE provider = ? AND bucket = ? "
+                    f"AND key IN ({', '.join('?' * len(chunk))})",
+                    (provider, bucket, *chunk)
+                )
+                versions.update(rows)
+        return versions
+    
+    async def listing_marker(self, provider: str, bucket: str, prefix: str) -> Optional[str]:
+        """Return the key the next incremental listing of a prefix should start after"""
+        return await asyncio.to_thread(self._listing_marker, provider, bucket, prefix)
+    
+    def _listing_marker(self, provider: str, bucket: str, prefix: str) -> Optional[str]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT last_key FROM listing_markers WHERE provider = ? AND bucket = ? AND prefix = ?",
+                (provider, bucket, prefix)
+            ).fetchone()
+        return row[0] if row else None
+    
+    async def set_listing_marker(self, provider: str, bucket: str, prefix: str, last_key: str) -> None:
+        """Remember the last key handled under a prefix"""
+        await asyncio.to_thread(self._set_listing_marker, provider, bucket, prefix, last_key)
+    
+    def _set_listing_marker(self, provider: str, bucket: str, prefix: str, last_key: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO listing_markers VALUES (?, ?, ?, ?)",
+                    (provider, bucket, prefix, last_key)
+                )
+    
+    async def mark(self, provider: str, bucket: str, files: Iterable[Tuple[str, Optional[str]]]) -> None:
+        """Record (key, version) pairs as imported, in one transaction"""
+        await asyncio.to_thread(self._mark, provider, bucket, list(files))
+    
+    def _mark(self, provider: str, bucket: str, files: List[Tuple[str, Optional[str]]]) -> None:
+        processed_at = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO processed_files VALUES (?, ?, ?, ?, ?)",
+                    [(provider, bucket, key, version, processed_at) for key, version in files]
+                )
+
 @dataclass
 class EmailConfig:
     """Configuration for email resume processing"""
@@ -44,6 +186,9 @@ class EmailConfig:
     folder: str = "INBOX"
     use_ssl: bool = True
     mark_processed: bool = True
+    max_connections: int = 4  # Parallel IMAP sessions used to fetch a backlog
+    max_concurrent_messages: int = 8  # Messages analyzed at once per session
+    chunk_size_bytes: int = 1024 * 1024  # IMAP socket receive buffer (0 keeps the OS default)
 
 @dataclass
 class CloudStorageConfig:
@@ -53,81 +198,260 @@ class CloudStorageConfig:
     bucket_name: str
     folder_path: str = "resumes/"
     auto_process: bool = True
+    # Resume S3 listings after the last key handled; only for append-only
+    # prefixes whose new keys sort last (e.g. date-stamped names)
+    incremental_listing: bool = False
 
 class ResumeSourceIntegrator:
     """Handles integration with multiple resume sources"""
     
     def __init__(self):
         self.supported_formats = ['.pdf', '.doc', '.docx', '.txt']
-        self.processed_files = set()
+        self._suffixes = tuple(ext.lower() for ext in self.supported_formats)  # str.endswith takes a tuple
+        self.processed_files = ProcessedFileStore(settings.processed_files_db)
+        
+        # Candidates waiting for the next batched insert, and background work
+        self._pending_candidates: List[Tuple[Dict[str, Any], str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._analysis_limiter: Optional[HostRateLimiter] = None  # Created on the running loop
+        self._tasks = set()
+        
+        # Cloud SDK clients by provider and credentials, reused across runs so
+        # config parsing and their connection pools aren't rebuilt every time
+        self._clients: Dict[Tuple, Any] = {}
     
     async def process_email_resumes(self, config: EmailConfig) -> Dict[str, Any]:
-        """Process resumes from email attachments"""
+        """Process resumes from unread email attachments"""
         try:
-            logger.info(f"📧 Processing resumes from {config.server}")
-            
-            # Connect to email server
-            if config.use_ssl:
-                mail = imaplib.IMAP4_SSL(config.server, config.port)
-            else:
-                mail = imaplib.IMAP4(config.server, config.port)
+            logger.info("📧 Processing resumes from %s", config.server)
             
-            mail.login(config.username, config.password)
-            mail.select(config.folder)
+            imap = await self._connect_imap(config)
+            try:
+                uids = await self._search_uids(imap, 'UNSEEN')
+                result = await self._process_email_uids_parallel(imap, uids, config)
+                await imap.close()
+            finally:
+                await imap.logout()
             
-            # Search for unread emails with attachments
-            status, messages = mail.search(None, '(UNSEEN)')
-            
-            if status != 'OK':
-                raise Exception("Failed to search emails")
-            
-            email_ids = messages[0].split()
-            processed_count = 0
-            errors = []
-            
-            for email_id in email_ids:
-                try:
-                    result = await self._process_email_message(mail, email_id, config)
-                    if result['success']:
-                        processed_count += 1
-                        if config.mark_processed:
-                            mail.store(email_id, '+FLAGS', '\\Seen')
-                    else:
-                        errors.append(result['error'])
-                        
-                except Exception as e:
-                    errors.append(f"Email {email_id}: {str(e)}")
-                    logger.error(f"Error processing email {email_id}: {str(e)}")
-            
-            mail.close()
-            mail.logout()
-            
-            logger.info(f"✅ Email processing completed: {processed_count} resumes processed")
+            logger.info("✅ Email processing completed: %s resumes processed", result['processed_count'])
             
             return {
                 'success': True,
-                'processed_count': processed_count,
-                'total_emails': len(email_ids),
-                'errors': errors
+                'processed_count': result['processed_count'],
+                'total_emails': len(uids),
+                'errors': result['errors']
             }
             
         except Exception as e:
-            logger.error(f"Email processing error: {str(e)}")
+            logger.error("Email processing error: %s", e)
             return {'success': False, 'error': str(e), 'processed_count': 0}
     
-    async def _process_email_message(self, mail, email_id: bytes, config: EmailConfig) -> Dict[str, Any]:
+    async def watch_email_resumes(self, config: EmailConfig, idle_timeout: int = IMAP_IDLE_TIMEOUT) -> None:
+        """
+        Process resumes as they arrive, using IMAP IDLE on a single connection
+        
+        Handles the unread backlog first, then waits for the server to push
+        EXISTS/RECENT notifications and fetches only UIDs above the highest
+        one in the folder when watching started. Runs until cancelled.
+        
+        Args:
+            config: Mailbox to watch
+            idle_timeout: Seconds before IDLE is re-issued
+        """
+        logger.info("📧 Watching %s/%s for resumes", config.server, config.folder)
+        
+        imap = await self._connect_imap(config)
+        try:
+            # Start IDLE after the newest message already in the folder, read or
+            # not, so later pushes only pick up mail that arrives from now on
+            highest_uid = max((int(uid) for uid in await self._search_uids(imap, 'ALL')), default=0)
+            
+            uids = await self._search_uids(imap, 'UNSEEN')
+            await self._process_email_uids_parallel(imap, uids, config)
+            last_uid = max([highest_uid, *(int(uid) for uid in uids)])
+            
+            while True:
+                idle = await imap.idle_start(timeout=idle_timeout)
+                push = await imap.wait_server_push(timeout=idle_timeout + 60)
+                imap.idle_done()
+                await asyncio.wait_for(idle, timeout=30)
+                
+                if push == aioimaplib.STOP_WAIT_SERVER_PUSH:
+                    continue
+                if not any(b'EXISTS' in line or b'RECENT' in line for line in push if isinstance(line, bytes)):
+                    continue
+                
+                # 'n:*' always matches the highest UID, so filter what was already handled
+                uids = [
+                    uid for uid in await self._search_uids(imap, f'UID {last_uid + 1}:*')
+                    if int(uid) > last_uid
+                ]
+                if not uids:
+                    continue
+                
+                result = await self._process_email_uids(imap, uids, config)
+                last_uid = max(int(uid) for uid in uids)
+                logger.info("📧 %s new resumes processed from %s", result['processed_count'], config.server)
+        finally:
+            await imap.logout()
+    
+    async def _connect_imap(self, config: EmailConfig) -> aioimaplib.IMAP4:
+        """Open an authenticated IMAP connection with the configured folder selected"""
+        if config.use_ssl:
+            imap = aioimaplib.IMAP4_SSL(host=config.server, port=config.port)
+        else:
+            imap = aioimaplib.IMAP4(host=config.server, port=config.port)
+        
+        await imap.wait_hello_from_server()
+        
+        # A larger receive window lets big attachment literals stream in fewer
+        # read/ACK cycles on high-latency links
+        sock = imap.protocol.transport.get_extra_info('socket')
+        if config.chunk_size_bytes and sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, config.chunk_size_bytes)
+        
+        response = await imap.login(config.username, config.password)
+        if response.result != 'OK':
+            raise Exception("Failed to log in to email server")
+        
+        response = await imap.select(config.folder)
+        if response.result != 'OK':
+            raise Exception(f"Failed to select folder {config.folder}")
+        
+        return imap
+    
+    async def _search_uids(self, imap: aioimaplib.IMAP4, criteria: str) -> List[str]:
+        """Return the UIDs matching an IMAP search"""
+        response = await imap.uid_search(criteria)
+        if response.result != 'OK':
+            raise Exception("Failed to search emails")
+        return response.lines[0].decode().split()
+    
+    async def _process_email_uids_parallel(self, imap: aioimaplib.IMAP4, uids: List[str], config: EmailConfig) -> Dict[str, Any]:
+        """
+        Process messages across a small pool of IMAP sessions
+        
+        Opens up to config.max_connections - 1 extra authenticated sessions and
+        deals the UIDs out round-robin, so fetches (and resume analysis) run
+        concurrently. Sessions that fail to connect are skipped.
+        """
+        session_count = min(config.max_connections, len(uids))
+        if session_count <= 1:
+            return await self._process_email_uids(imap, uids, config)
+        
+        extra_sessions = await asyncio.gather(
+            *(self._connect_imap(config) for _ in range(session_count - 1)),
+            return_exceptions=True
+        )
+        sessions = [imap] + [session for session in extra_sessions if not isinstance(session, Exception)]
+        
+        try:
+            results = await asyncio.gather(*(
+                self._process_email_uids(session, uids[i::len(sessions)], config)
+                for i, session in enumerate(sessions)
+            ))
+        finally:
+            await asyncio.gather(*(session.logout() for session in sessions[1:]), return_exceptions=True)
+        
+        return {
+            'processed_count': sum(result['processed_count'] for result in results),
+            'errors': [error for result in results for error in result['errors']]
+        }
+    
+    async def _process_email_uids(self, imap: aioimaplib.IMAP4, uids: List[str], config: EmailConfig) -> Dict[str, Any]:
+        """
+        Process the given messages, flagging successful ones as seen
+        
+        Messages are fetched EMAIL_FETCH_BATCH_SIZE at a time with one UID
+        FETCH each, and the next batch downloads while the current one is
+        analyzed (up to config.max_concurrent_messages at once). Successful
+        messages are flagged with a single UID STORE at the end, which also
+        runs if a batch fails part-way.
+        """
+        semaphore = asyncio.Semaphore(config.max_concurrent_messages)
+        
+        async def _guarded(email_message: email.message.Message) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._process_email_message(email_message)
+        
+        batches = [uids[i:i + EMAIL_FETCH_BATCH_SIZE] for i in range(0, len(uids), EMAIL_FETCH_BATCH_SIZE)]
+        processed_uids = []
+        errors = []
+        
+        next_fetch = asyncio.create_task(self._fetch_email_messages(imap, batches[0])) if batches else None
+        try:
+            for i, batch in enumerate(batches):
+                messages = await next_fetch
+                if i + 1 < len(batches):
+                    next_fetch = asyncio.create_task(self._fetch_email_messages(imap, batches[i + 1]))
+                
+                fetched_uids = [uid for uid in batch if uid in messages]
+                errors.extend(f"Email {uid}: Failed to fetch email" for uid in batch if uid not in messages)
+                
+                results = await asyncio.gather(
+                    *(_guarded(messages[uid]) for uid in fetched_uids),
+                    return_exceptions=True
+                )
+                
+                for uid, result in zip(fetched_uids, results):
+                    if isinstance(result, Exception):
+                        errors.append(f"Email {uid}: {str(result)}")
+                        logger.error("Error processing email %s: %s", uid, result)
+                    elif result['success']:
+                        processed_uids.append(uid)
+                    else:
+                        errors.append(result['error'])
+        finally:
+            # Flag what was imported even if a later batch failed, so those
+            # messages aren't imported again on the next run
+            if next_fetch is not None and not next_fetch.done():
+                next_fetch.cancel()
+                await asyncio.gather(next_fetch, return_exceptions=True)
+            if processed_uids and config.mark_processed:
+                await imap.uid('store', ','.join(processed_uids), '+FLAGS', '(\\Seen)')
+        
+        return {'processed_count': len(processed_uids), 'errors': errors}
+    
+    async def _fetch_email_messages(self, imap: aioimaplib.IMAP4, uids: List[str]) -> Dict[str, email.message.Message]:
+        """
+        Fetch several messages in one UID FETCH
+        
+        BODY.PEEK[] leaves the messages unseen, so ones that fail processing
+        stay in the inbox for the next run.
+        
+        Returns:
+            Parsed messages keyed by UID (messages the server didn't return are missing)
+        """
+        response = await imap.uid('fetch', ','.join(uids), '(UID BODY.PEEK[])')
+        if response.result != 'OK':
+            raise Exception("Failed to fetch emails")
+        
+        # Each message is a '* n FETCH (UID u BODY[] {size}' line followed by
+        # the literal as a bytearray; servers may also send UID after the body
+        raw_messages = {}
+        uid = body = None
+        for line in response.lines:
+            if isinstance(line, bytearray):
+                body = bytes(line)
+            else:
+                if b' FETCH (' in line:
+                    uid = body = None
+                match = _FETCH_UID_RE.search(line)
+                if match:
+                    uid = match.group(1).decode()
+            
+            if uid is not None and body is not None:
+                raw_messages[uid] = body
+                uid = body = None
+        
+        # The stdlib MIME parser is pure Python, so the batch is parsed on a worker thread
+        return await asyncio.to_thread(
+            lambda: {uid: email.message_from_bytes(body) for uid, body in raw_messages.items()}
+        )
+    
+    async def _process_email_message(self, email_message: email.message.Message) -> Dict[str, Any]:
         """Process individual email message"""
         try:
-            # Fetch email message
-            status, msg_data = mail.fetch(email_id, '(RFC822)')
-            
-            if status != 'OK':
-                return {'success': False, 'error': 'Failed to fetch email'}
-            
-            # Parse email
-            email_body = msg_data[0][1]
-            email_message = email.message_from_bytes(email_body)
-            
             # Extract sender information
             sender_email = email_message.get('From', '')
             sender_name = email_message.get('Reply-To', sender_email)
@@ -141,30 +465,24 @@ class ResumeSourceIntegrator:
                     if part.get_content_disposition() == 'attachment':
                         filename = part.get_filename()
                         
-                        if filename and any(filename.lower().endswith(ext) for ext in self.supported_formats):
-                            # Save attachment temporarily
-                            file_data = part.get_payload(decode=True)
+                        if filename and filename.lower().endswith(self._suffixes):
+                            # Decode large (base64/quoted-printable) attachments off the event loop
+                            if len(part.get_payload()) > ATTACHMENT_DECODE_OFFLOAD_SIZE:
+                                content = await asyncio.to_thread(part.get_payload, decode=True)
+                            else:
+                                content = part.get_payload(decode=True)
                             
-                            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as tmp_file:
-                                tmp_file.write(file_data)
-                                tmp_file_path = tmp_file.name
+                            # Process resume
+                            result = await self._process_resume_bytes(
+                                content,
+                                filename,
+                                sender_name,
+                                sender_email,
+                                f"Email application: {subject}"
+                            )
                             
-                            try:
-                                # Process resume
-                                result = await self._process_resume_file(
-                                    tmp_file_path,
-                                    filename,
-                                    sender_name,
-                                    sender_email,
-                                    f"Email application: {subject}"
-                                )
-                                
-                                if result['success']:
-                                    attachments_processed.append(result)
-                                
-                            finally:
-                                # Clean up temp file
-                                os.unlink(tmp_file_path)
+                            if result['success']:
+                                attachments_processed.append(result)
             
             if attachments_processed:
                 return {
@@ -181,7 +499,7 @@ class ResumeSourceIntegrator:
     async def process_cloud_storage_resumes(self, config: CloudStorageConfig) -> Dict[str, Any]:
         """Process resumes from cloud storage"""
         try:
-            logger.info(f"☁️ Processing resumes from {config.provider}")
+            logger.info("☁️ Processing resumes from %s", config.provider)
             
             if config.provider == 'aws':
                 return await self._process_aws_s3_resumes(config)
@@ -193,110 +511,185 @@ class ResumeSourceIntegrator:
                 raise ValueError(f"Unsupported provider: {config.provider}")
             
         except Exception as e:
-            logger.error(f"Cloud storage processing error: {str(e)}")
+            logger.error("Cloud storage processing error: %s", e)
             return {'success': False, 'error': str(e), 'processed_count': 0}
     
     async def _process_aws_s3_resumes(self, config: CloudStorageConfig) -> Dict[str, Any]:
         """Process resumes from AWS S3"""
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        
         try:
-            s3_client = boto3.client(
+            transfer_config = TransferConfig(
+                multipart_threshold=S3_PART_SIZE,
+                multipart_chunksize=S3_PART_SIZE,
+                max_concurrency=S3_PART_CONCURRENCY,
+                use_threads=True
+            )
+            s3_client = self._get_client(config, lambda: boto3.client(
                 's3',
                 aws_access_key_id=config.credentials['access_key'],
                 aws_secret_access_key=config.credentials['secret_key'],
                 region_name=config.credentials.get('region', 'us-east-1')
+            ))
+            
+            # List every object under the prefix (1000 keys per ListObjectsV2 page),
+            # or only those after the last run's marker
+            start_after = None
+            if config.incremental_listing:
+                start_after = await self.processed_files.listing_marker('aws', config.bucket_name, config.folder_path)
+            all_objects = await asyncio.to_thread(self._list_s3_objects, s3_client, config, start_after)
+            
+            # Skip non-resumes and objects whose ETag was already imported; no per-key HEAD
+            resumes = [obj for obj in all_objects if obj[0].lower().endswith(self._suffixes)]
+            imported = await self.processed_files.versions(
+                'aws', config.bucket_name, [key for key, _, _ in resumes]
             )
+            objects = [(key, etag, size) for key, etag, size in resumes if imported.get(key) != etag]
             
-            # List objects in bucket
-            response = s3_client.list_objects_v2(
-                Bucket=config.bucket_name,
-                Prefix=config.folder_path
-            )
+            download_slots = asyncio.Semaphore(S3_MAX_CONCURRENT_DOWNLOADS)
+            analysis_slots = asyncio.Semaphore(settings.max_concurrent_processing)
             
-            processed_count = 0
+            def get_small_object(key: str) -> bytes:
+                return s3_client.get_object(Bucket=config.bucket_name, Key=key)['Body'].read()
             
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    key = obj['Key']
+            async def process_object(key: str, size: int) -> bool:
+                try:
+                    # Download into memory; the slot is freed before analysis so the link stays busy
+                    async with download_slots:
+                        if size < S3_PART_SIZE:
+                            # Typical resumes: the listing already gave the size, so one
+                            # GET replaces download_fileobj's HEAD + GET
+                            content = await asyncio.to_thread(get_small_object, key)
+                        else:
+                            # Ranged multipart GETs on boto3's transfer threads
+                            buffer = io.BytesIO()
+                            await asyncio.to_thread(
+                                s3_client.download_fileobj,
+                                config.bucket_name,
+                                key,
+                                buffer,
+                                Config=transfer_config
+                            )
+                            content = buffer.getvalue()
                     
-                    # Skip if already processed or not a resume file
-                    if key in self.processed_files or not any(key.lower().endswith(ext) for ext in self.supported_formats):
-                        continue
+                    # Process resume
+                    async with analysis_slots:
+                        result = await self._process_resume_bytes(
+                            content,
+                            Path(key).name,
+                            "Unknown",  # Name will be extracted from resume
+                            "unknown@example.com",  # Email will be extracted from resume
+                            f"S3 Upload: {key}"
+                        )
                     
-                    try:
-                        # Download file
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(key).suffix) as tmp_file:
-                            s3_client.download_file(config.bucket_name, key, tmp_file.name)
-                            
-                            # Process resume
-                            result = await self._process_resume_file(
-                                tmp_file.name,
-                                Path(key).name,
-                                "Unknown",  # Name will be extracted from resume
-                                "unknown@example.com",  # Email will be extracted from resume
-                                f"S3 Upload: {key}"
-                            )
-                            
-                            if result['success']:
-                                processed_count += 1
-                                self.processed_files.add(key)
-                            
-                        # Clean up temp file
-                        os.unlink(tmp_file.name)
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing S3 file {key}: {str(e)}")
-                        continue
+                    return result['success']
+                    
+                except Exception as e:
+                    logger.error("Error processing S3 file %s: %s", key, e)
+                    return False
+            
+            results = await asyncio.gather(*(process_object(key, size) for key, _, size in objects))
+            await self.processed_files.mark(
+                'aws', config.bucket_name,
+                [(key, etag) for (key, etag, _), success in zip(objects, results) if success]
+            )
+            
+            if config.incremental_listing:
+                # Advance only up to the first failure so it is retried next run
+                failed = {key for (key, _, _), success in zip(objects, results) if not success}
+                last_key = None
+                for key, _, _ in all_objects:  # ListObjectsV2 returns keys in order
+                    if key in failed:
+                        break
+                    last_key = key
+                if last_key is not None:
+                    await self.processed_files.set_listing_marker('aws', config.bucket_name, config.folder_path, last_key)
             
             return {
                 'success': True,
-                'processed_count': processed_count,
-                'total_files': len(response.get('Contents', []))
+                'processed_count': sum(results),
+                'total_files': len(all_objects)
             }
             
         except Exception as e:
             raise Exception(f"S3 processing error: {str(e)}")
     
+    def _list_s3_objects(self, s3_client, config: CloudStorageConfig, start_after: Optional[str] = None) -> List[Tuple[str, str, int]]:
+        """List the (key, ETag, size) of every object under the configured prefix, optionally after a key"""
+        paginator = s3_client.get_paginator('list_objects_v2')
+        list_kwargs = {'Bucket': config.bucket_name, 'Prefix': config.folder_path}
+        if start_after:
+            list_kwargs['StartAfter'] = start_after
+        return [
+            (obj['Key'], obj['ETag'], obj['Size'])
+            for page in paginator.paginate(**list_kwargs)
+            for obj in page.get('Contents', [])
+        ]
+    
     async def _process_gcs_resumes(self, config: CloudStorageConfig) -> Dict[str, Any]:
         """Process resumes from Google Cloud Storage"""
+        from google.cloud import storage as gcs
+        from google.cloud.storage import transfer_manager
+        
         try:
             # Initialize GCS client
-            client = gcs.Client.from_service_account_info(config.credentials)
+            client = self._get_client(config, lambda: gcs.Client.from_service_account_info(config.credentials))
             bucket = client.bucket(config.bucket_name)
             
-            processed_count = 0
+            # The SDK is synchronous, so listing and downloads run on worker threads
+            blobs = await asyncio.to_thread(lambda: list(bucket.list_blobs(prefix=config.folder_path)))
+            resumes = [blob for blob in blobs if blob.name.lower().endswith(self._suffixes)]
+            imported = await self.processed_files.versions(
+                'gcs', config.bucket_name, [blob.name for blob in resumes]
+            )
+            pending = [blob for blob in resumes if imported.get(blob.name) != str(blob.generation)]
+            
+            # Download every pending blob at once; failures come back as exceptions
+            pairs = [(blob, io.BytesIO()) for blob in pending]
+            download_results = await asyncio.to_thread(
+                transfer_manager.download_many,
+                pairs,
+                max_workers=GCS_MAX_CONCURRENT_DOWNLOADS,
+                worker_type=transfer_manager.THREAD
+            )
             
-            for blob in bucket.list_blobs(prefix=config.folder_path):
-                if blob.name in self.processed_files or not any(blob.name.lower().endswith(ext) for ext in self.supported_formats):
-                    continue
+            analysis_slots = asyncio.Semaphore(settings.max_concurrent_processing)
+            
+            async def process_blob(blob, buffer: io.BytesIO, download_result) -> bool:
+                if isinstance(download_result, Exception):
+                    logger.error("Error processing GCS file %s: %s", blob.name, download_result)
+                    return False
                 
                 try:
-                    # Download file
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(blob.name).suffix) as tmp_file:
-                        blob.download_to_filename(tmp_file.name)
-                        
-                        # Process resume
-                        result = await self._process_resume_file(
-                            tmp_file.name,
+                    # Process resume
+                    async with analysis_slots:
+                        result = await self._process_resume_bytes(
+                            buffer.getvalue(),
                             Path(blob.name).name,
                             "Unknown",
                             "unknown@example.com",
                             f"GCS Upload: {blob.name}"
                         )
-                        
-                        if result['success']:
-                            processed_count += 1
-                            self.processed_files.add(blob.name)
                     
-                    # Clean up temp file
-                    os.unlink(tmp_file.name)
+                    return result['success']
                     
                 except Exception as e:
-                    logger.error(f"Error processing GCS file {blob.name}: {str(e)}")
-                    continue
+                    logger.error("Error processing GCS file %s: %s", blob.name, e)
+                    return False
+            
+            results = await asyncio.gather(*(
+                process_blob(blob, buffer, download_result)
+                for (blob, buffer), download_result in zip(pairs, download_results)
+            ))
+            await self.processed_files.mark(
+                'gcs', config.bucket_name,
+                [(blob.name, str(blob.generation)) for blob, success in zip(pending, results) if success]
+            )
             
             return {
                 'success': True,
-                'processed_count': processed_count
+                'processed_count': sum(results)
             }
             
         except Exception as e:
@@ -304,136 +697,232 @@ class ResumeSourceIntegrator:
     
     async def _process_dropbox_resumes(self, config: CloudStorageConfig) -> Dict[str, Any]:
         """Process resumes from Dropbox"""
+        from dropbox import Dropbox
+        
         try:
-            dbx = Dropbox(config.credentials['access_token'])
+            dbx = self._get_client(config, lambda: Dropbox(config.credentials['access_token']))
             
-            # List files in folder
-            result = dbx.files_list_folder(config.folder_path)
-            processed_count = 0
+            # List files in folder (the Dropbox SDK blocks, so calls run on worker threads)
+            result = await asyncio.to_thread(dbx.files_list_folder, config.folder_path)
+            entries = [entry for entry in result.entries if entry.name.lower().endswith(self._suffixes)]
+            imported = await self.processed_files.versions(
+                'dropbox', config.folder_path, [entry.path_lower for entry in entries]
+            )
+            processed = []
             
-            for entry in result.entries:
-                if entry.name in self.processed_files or not any(entry.name.lower().endswith(ext) for ext in self.supported_formats):
+            for entry in entries:
+                if imported.get(entry.path_lower) == entry.rev:
                     continue
                 
                 try:
                     # Download file
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(entry.name).suffix) as tmp_file:
-                        metadata, response = dbx.files_download(entry.path_lower)
-                        tmp_file.write(response.content)
-                        tmp_file.flush()
-                        
-                        # Process resume
-                        result = await self._process_resume_file(
-                            tmp_file.name,
-                            entry.name,
-                            "Unknown",
-                            "unknown@example.com",
-                            f"Dropbox Upload: {entry.name}"
-                        )
-                        
-                        if result['success']:
-                            processed_count += 1
-                            self.processed_files.add(entry.name)
+                    metadata, response = await asyncio.to_thread(dbx.files_download, entry.path_lower)
                     
-                    # Clean up temp file
-                    os.unlink(tmp_file.name)
+                    # Process resume
+                    result = await self._process_resume_bytes(
+                        response.content,
+                        entry.name,
+                        "Unknown",
+                        "unknown@example.com",
+                        f"Dropbox Upload: {entry.name}"
+                    )
+                    
+                    if result['success']:
+                        processed.append((entry.path_lower, entry.rev))
                     
                 except Exception as e:
-                    logger.error(f"Error processing Dropbox file {entry.name}: {str(e)}")
+                    logger.error("Error processing Dropbox file %s: %s", entry.name, e)
                     continue
             
+            await self.processed_files.mark('dropbox', config.folder_path, processed)
+            
             return {
                 'success': True,
-                'processed_count': processed_count
+                'processed_count': len(processed)
             }
             
         except Exception as e:
             raise Exception(f"Dropbox processing error: {str(e)}")
     
-    async def _process_resume_file(self, file_path: str, filename: str, candidate_name: str, 
-                                  candidate_email: str, source: str) -> Dict[str, Any]:
-        """Process a single resume file"""
+    def _get_client(self, config: CloudStorageConfig, factory: Callable[[], Any]) -> Any:
+        """Return the cached SDK client for a provider and credentials, building it on first use"""
+        key = (config.provider, tuple(sorted(config.credentials.items())))
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = factory()
+        return client
+    
+    async def _process_resume_bytes(self, content: bytes, filename: str, candidate_name: str, 
+                                   candidate_email: str, source: str) -> Dict[str, Any]:
+        """Process a single resume already downloaded into memory"""
         try:
-            # Process file to extract text
-            with open(file_path, 'rb') as f:
-                file_content = f.read()
-            
-            # Create a mock UploadFile for processing
-            class MockUploadFile:
-                def __init__(self, filename: str, content: bytes):
-                    self.filename = filename
-                    self.content = content
-                    
-                async def read(self):
-                    return self.content
-            
-            mock_file = MockUploadFile(filename, file_content)
-            file_result = await file_processor.process_resume_file(mock_file)
+            # The file processor writes the one stored copy, so no temp file is needed
+            file_result = await file_processor.process_resume_file(_BytesUploadFile(filename, content))
             
             if not file_result["success"]:
                 return {'success': False, 'error': 'Failed to process resume file'}
             
             # Extract candidate information from resume text if not provided
             if candidate_name == "Unknown" or candidate_email == "unknown@example.com":
-                extracted_info = await self._extract_candidate_info(file_result["extracted_text"])
+                extracted_info = await self._extract_candidate_info(
+                    file_result["raw_text"],
+                    file_result["metadata"]["potential_contact_info"]
+                )
                 if extracted_info:
-                    candidate_name = extracted_info.get('name', candidate_name)
-                    candidate_email = extracted_info.get('email', candidate_email)
+                    if candidate_name == "Unknown":
+                        candidate_name = extracted_info.get('name', candidate_name)
+                    if candidate_email == "unknown@example.com":
+                        candidate_email = extracted_info.get('email', candidate_email)
             
             # Create candidate record
-            async with get_db() as db:
-                # Check if candidate already exists
-                existing_candidate = db.query(Candidate).filter(
-                    Candidate.email == candidate_email
-                ).first()
-                
-                if existing_candidate:
-                    return {
-                        'success': False,
-                        'error': f'Candidate with email {candidate_email} already exists'
-                    }
-                
-                # Create new candidate
-                candidate = Candidate(
-                    name=candidate_name,
-                    email=candidate_email,
-                    resume_filename=filename,
-                    resume_file_path=file_result["file_path"],
-                    resume_text=file_result["extracted_text"],
-                    status="new",
-                    human_review_notes=f"Imported from {source}"
+            return await self._save_candidate(dict(
+                name=candidate_name,
+                email=candidate_email,
+                resume_filename=filename,
+                resume_file_path=file_result["file_path"],
+                resume_text=file_result["extracted_text"],
+                status="new",
+                human_review_notes=f"Imported from {source}"
+            ), source)
+            
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
+    async def _save_candidate(self, candidate_row: Dict[str, Any], source: str) -> Dict[str, Any]:
+        """
+        Queue a candidate for the next batched insert and wait for its result
+        
+        Concurrent imports land in one transaction: the batch is written once
+        CANDIDATE_BATCH_SIZE rows are waiting or CANDIDATE_BATCH_DELAY has
+        passed since the first one arrived.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_candidates.append((candidate_row, source, future))
+        
+        if len(self._pending_candidates) >= CANDIDATE_BATCH_SIZE:
+            self._flush_candidates()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(CANDIDATE_BATCH_DELAY, self._flush_candidates)
+        
+        return await future
+    
+    def _flush_candidates(self) -> None:
+        """Start inserting the queued candidates"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending_candidates = self._pending_candidates, []
+        if batch:
+            self._track(asyncio.create_task(self._insert_candidates(batch)))
+    
+    async def _insert_candidates(self, batch: List[Tuple[Dict[str, Any], str, asyncio.Future]]) -> None:
+        """Insert a batch of candidates in one transaction and resolve each caller's result"""
+        try:
+            async with bounded_async_session() as db:
+                # Check every incoming email against existing candidates in a single query
+                result = await db.execute(
+                    select(Candidate.email).where(
+                        Candidate.email.in_({candidate_row['email'] for candidate_row, _, _ in batch})
+                    )
                 )
+                existing = set(result.scalars())
                 
-                db.add(candidate)
-                db.commit()
-                db.refresh(candidate)
-                
-                # Trigger AI analysis
-                try:
-                    await resume_analyzer.analyze_resume(candidate)
-                except Exception as e:
-                    logger.warning(f"Resume analysis failed for {candidate.id}: {str(e)}")
+                created = []
+                for candidate_row, source, future in batch:
+                    if candidate_row['email'] in existing:
+                        future.set_result({
+                            'success': False,
+                            'error': f"Candidate with email {candidate_row['email']} already exists"
+                        })
+                        continue
+                    
+                    existing.add(candidate_row['email'])  # Also skip duplicates within this batch
+                    created.append((Candidate(**candidate_row), source, future))
                 
-                return {
-                    'success': True,
-                    'candidate_id': str(candidate.id),
-                    'candidate_name': candidate.name,
-                    'candidate_email': candidate.email,
-                    'source': source
-                }
-            
+                db.add_all([candidate for candidate, _, _ in created])
+                await db.commit()
         except Exception as e:
-            return {'success': False, 'error': str(e)}
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result({'success': False, 'error': str(e)})
+            return
+        
+        for candidate, source, future in created:
+            future.set_result({
+                'success': True,
+                'candidate_id': str(candidate.id),
+                'candidate_name': candidate.name,
+                'candidate_email': candidate.email,
+                'source': source
+            })
+            
+            # AI analysis runs in the background so imports aren't held up by LLM calls
+            self._track(asyncio.create_task(self._analyze_candidate(candidate)))
     
-    async def _extract_candidate_info(self, resume_text: str) -> Optional[Dict[str, str]]:
-        """Extract candidate name and email from resume text using AI"""
+    async def _analyze_candidate(self, candidate: Candidate) -> None:
+        """Run AI analysis for a newly imported candidate"""
+        if self._analysis_limiter is None:
+            self._analysis_limiter = HostRateLimiter(
+                requests_per_second=ANALYSIS_REQUESTS_PER_SECOND,
+                burst=settings.max_concurrent_processing,
+                max_concurrency=settings.max_concurrent_processing
+            )
+        
+        async with self._analysis_limiter.acquire():
+            try:
+                await resume_analyzer.analyze_resume(candidate)
+            except Exception as e:
+                logger.warning("Resume analysis failed for %s: %s", candidate.id, e)
+    
+    async def close(self) -> None:
+        """Finish pending candidate inserts and background resume analyses"""
+        self._flush_candidates()
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    def _track(self, task: asyncio.Task) -> None:
+        """Keep a reference to a background task until it finishes"""
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _extract_candidate_info(
+        self,
+        resume_text: str,
+        contact_info: Optional[Dict[str, Optional[str]]] = None
+    ) -> Optional[Dict[str, str]]:
+        """
+        Extract candidate name and email from resume text
+        
+        Uses precompiled patterns (and the contact details the file processor
+        already matched) rather than an LLM call per resume.
+        
+        Args:
+            resume_text: Raw resume text, with line breaks preserved
+            contact_info: Contact details already found by the file processor
+            
+        Returns:
+            Whichever of 'name' and 'email' were found, or None
+        """
         try:
-            # This would use AI to extract candidate information
-            # For now, return None to use fallback values
-            return None
+            extracted_info = {}
+            
+            email_address = (contact_info or {}).get('email')
+            if not email_address:
+                email_match = EMAIL_RE.search(resume_text)
+                email_address = email_match.group() if email_match else None
+            if email_address:
+                extracted_info['email'] = email_address
+            
+            first_line = next((line.strip() for line in resume_text.splitlines() if line.strip()), '')
+            if len(first_line) <= 80 and _NAME_LINE_RE.match(first_line) and first_line.lower() != 'curriculum vitae':
+                extracted_info['name'] = first_line
+            
+            return extracted_info or None
             
         except Exception as e:
-            logger.error(f"Error extracting candidate info: {str(e)}")
+            logger.error("Error extracting candidate info: %s", e)
             return None
 
 # Example configurations
@@ -483,18 +972,18 @@ async def scheduled_resume_processing():
     try:
         email_result = await resume_source_integrator.process_email_resumes(EXAMPLE_EMAIL_CONFIG)
         results['email'] = email_result
-        logger.info(f"📧 Email processing: {email_result['processed_count']} resumes processed")
+        logger.info("📧 Email processing: %s resumes processed", email_result['processed_count'])
     except Exception as e:
-        logger.error(f"Email processing failed: {str(e)}")
+        logger.error("Email processing failed: %s", e)
         results['email'] = {'success': False, 'error': str(e)}
     
     # Process cloud storage resumes
     try:
         cloud_result = await resume_source_integrator.process_cloud_storage_resumes(EXAMPLE_AWS_CONFIG)
         results['cloud'] = cloud_result
-        logger.info(f"☁️ Cloud processing: {cloud_result['processed_count']} resumes processed")
+        logger.info("☁️ Cloud processing: %s resumes processed", cloud_result['processed_count'])
     except Exception as e:
-        logger.error(f"Cloud processing failed: {str(e)}")
+        logger.error("Cloud processing failed: %s", e)
         results['cloud'] = {'success': False, 'error': str(e)}
     
     total_processed = sum(
@@ -503,6 +992,6 @@ async def scheduled_resume_processing():
         if result.get('success', False)
     )
     
-    logger.info(f"✅ Scheduled resume processing completed: {total_processed} resumes processed")
+    logger.info("✅ Scheduled resume processing completed: %s resumes processed", total_processed)
     
     return results 
\ No newline at end of file
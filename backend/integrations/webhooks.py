@@ -3,23 +3,35 @@ Webhook Integrations for RecruitAI Pro
 Receive real-time data from external systems via webhooks
 """
 
-import json
+import asyncio
+import base64
 import logging
+import math
+import os
+import random
+import socket
+import time
+import orjson
 from datetime import datetime
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
 from fastapi import APIRouter, Request, HTTPException, Depends, Header
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import hmac
 import hashlib
 from pydantic import BaseModel
 
-from core.database import get_db
+from core.config import settings
+from core.database import get_async_db, AsyncSessionLocal
+from core.message_broker import message_broker
 from models.candidates import Candidate
 from models.jobs import JobPosition
 from models.interviews import Interview
 from agents.resume_analyzer import resume_analyzer
 from agents.scheduler import scheduler_agent
+from integrations.job_boards import HostRateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +47,117 @@ WEBHOOK_SECRETS = {
     'career_site': 'your_career_site_webhook_secret'
 }
 
+# Per-source overrides of (requests per second, burst); other sources use
+# settings.webhook_rate_per_second / settings.webhook_burst
+WEBHOOK_RATE_LIMITS = {
+    'career_site': (20.0, 100),
+}
+
+# Token bucket kept in Redis so every worker process shares one budget per source.
+# Returns {allowed, milliseconds until the next token}.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) / 1000 * rate)
+local allowed = 0
+local wait_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait_ms = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, wait_ms}
+"""
+_token_bucket = None  # Registered on first use against the connected client
+
+async def _enforce_rate_limit(source: str) -> None:
+    """
+    Take a token from the source's bucket
+    
+    Raises:
+        HTTPException: 429 with Retry-After when the source is over its limit
+    """
+    global _token_bucket
+    if not message_broker.connected:
+        return
+    
+    rate, burst = WEBHOOK_RATE_LIMITS.get(source, (settings.webhook_rate_per_second, settings.webhook_burst))
+    try:
+        if _token_bucket is None:
+            _token_bucket = message_broker.redis_client.register_script(_TOKEN_BUCKET_LUA)
+        allowed, wait_ms = await _token_bucket(
+            keys=[f"webhook_rate:{source}"],
+            args=[rate, burst, int(time.time() * 1000)]
+        )
+    except Exception as e:
+        # Don't turn away deliveries because the limiter itself is unavailable
+        logger.warning("⚠️  Webhook rate limit check failed for %s: %s", source, e)
+        return
+    
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(max(1, math.ceil(wait_ms / 1000)))}
+        )
+
+@lru_cache(maxsize=64)
+def _hmac_template(secret: str) -> "hmac.HMAC":
+    """Keyed HMAC-SHA256 for a secret; copy() it per payload to skip re-keying"""
+    return hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
+
+HMAC_HEX_LENGTH = hashlib.sha256().digest_size * 2
+
+# Deliveries are queued on a Redis stream and processed by a consumer group,
+# so endpoints acknowledge quickly and bursts don't contend for the database
+WEBHOOK_STREAM = "webhook_events"
+WEBHOOK_CONSUMER_GROUP = "webhook_processors"
+WEBHOOK_WORKER_COUNT = 16
+WEBHOOK_READ_COUNT = 100
+WEBHOOK_BLOCK_MS = 5000
+
+# Entries left pending (a worker crashed or processing raised) are reclaimed
+# after WEBHOOK_RECLAIM_IDLE_MS; after WEBHOOK_MAX_DELIVERIES attempts they are
+# moved to the dead-letter stream for inspection instead of retried forever
+WEBHOOK_DLQ_STREAM = "webhook_events:dlq"
+WEBHOOK_MAX_DELIVERIES = 5
+WEBHOOK_RECLAIM_IDLE_MS = 60000
+WEBHOOK_RECLAIM_INTERVAL = 30
+
+# Each delivery is first retried in-process with exponential backoff and
+# jitter, which rides out brief database hiccups without waiting to be reclaimed
+WEBHOOK_RETRY_ATTEMPTS = 4
+WEBHOOK_RETRY_BASE_DELAY = 0.5
+WEBHOOK_RETRY_MAX_DELAY = 8.0
+WEBHOOK_RETRY_JITTER = 0.5
+
+# Senders retry deliveries they consider failed; each (source, event id) is
+# recorded in Redis so a redelivery returns the first result without reprocessing
+WEBHOOK_DELIVERY_PREFIX = "webhook_delivery"
+WEBHOOK_DELIVERY_ID_HEADERS = ('x-delivery-id', 'x-event-id', 'x-webhook-id')
+WEBHOOK_DELIVERY_TTL = 72 * 3600  # covers typical sender retry windows
+# In-flight marker; kept shorter than WEBHOOK_RECLAIM_IDLE_MS so that by the time
+# a crashed worker's entry is reclaimed its marker has expired and it is reprocessed
+WEBHOOK_DELIVERY_LOCK_TTL = 45
+
+# Applicants' resumes are analysed after the delivery is processed, paced
+# so a burst of applications doesn't turn into a burst of LLM calls
+WEBHOOK_ANALYSIS_REQUESTS_PER_SECOND = 2.0
+
+def _external_job_ref(source: str, external_id: str) -> str:
+    """Reference stored on jobs created from a source's webhook; matched by equality so it can use an index"""
+    return f'{source}:{external_id}'
+
+class WebhookDeliveryInProgress(Exception):
+    """Another worker holds the delivery's in-flight marker and has not recorded a result yet"""
+
 class WebhookProcessor:
     """Handles processing of webhook events from various sources"""
     
@@ -47,45 +170,104 @@ class WebhookProcessor:
             'candidate_status_change': self._handle_candidate_status_change,
             'form_submission': self._handle_form_submission
         }
+        self._analysis_limiter: Optional[HostRateLimiter] = None  # Created on the running loop
+        self._tasks = set()
     
     def verify_webhook_signature(self, payload: bytes, signature: str, secret: str) -> bool:
         """Verify webhook signature for security"""
         try:
             # Create expected signature
-            expected_signature = hmac.new(
-                secret.encode('utf-8'),
-                payload,
-                hashlib.sha256
-            ).hexdigest()
+            mac = _hmac_template(secret).copy()
+            mac.update(payload)
             
-            # Compare signatures
-            return hmac.compare_digest(signature, expected_signature)
+            # Hex signatures compare as-is; anything else is treated as base64
+            # and compared against the raw digest
+            if len(signature) == HMAC_HEX_LENGTH:
+                return hmac.compare_digest(signature, mac.hexdigest())
+            return hmac.compare_digest(base64.b64decode(signature, validate=True), mac.digest())
             
         except Exception as e:
-            logger.error(f"Signature verification error: {str(e)}")
+            logger.error("Signature verification error: %s", e)
             return False
     
     async def process_webhook(self, source: str, event_type: str, data: Dict[str, Any], 
-                            db: Session) -> Dict[str, Any]:
-        """Process incoming webhook event"""
+                            db: AsyncSession, delivery_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Process incoming webhook event (once per source and event id)
+        
+        Returns:
+            Handler result; {'success': False, ...} for deliveries that can't be processed
+        
+        Raises:
+            WebhookDeliveryInProgress: The delivery is claimed but has no result yet; leave it pending
+            Exception: Transient failures (database errors), so the delivery is retried
+        """
+        delivery_key = None
         try:
-            logger.info(f"🔗 Processing webhook: {source} - {event_type}")
+            logger.info("🔗 Processing webhook: %s - %s", source, event_type)
             
             handler = self.event_handlers.get(event_type)
             if not handler:
-                logger.warning(f"No handler for event type: {event_type}")
+                logger.warning("No handler for event type: %s", event_type)
                 return {'success': False, 'error': f'Unknown event type: {event_type}'}
             
+            if message_broker.connected:
+                key = self._delivery_key(source, data, delivery_id)
+                if not await message_broker.redis_client.set(key, '', nx=True, ex=WEBHOOK_DELIVERY_LOCK_TTL):
+                    previous = await self._previous_result(key)
+                    if previous is None:
+                        raise WebhookDeliveryInProgress(key)
+                    return previous
+                delivery_key = key
+            
             result = await handler(data, db, source)
             
-            logger.info(f"✅ Webhook processed successfully: {source} - {event_type}")
+            if delivery_key:
+                if result.get('success'):
+                    await message_broker.redis_client.set(
+                        delivery_key, orjson.dumps(result), ex=WEBHOOK_DELIVERY_TTL
+                    )
+                else:
+                    # Let a redelivery try again
+                    await message_broker.redis_client.delete(delivery_key)
+                delivery_key = None
+            
+            logger.info("✅ Webhook processed successfully: %s - %s", source, event_type)
             return result
             
+        except WebhookDeliveryInProgress:
+            raise
         except Exception as e:
-            logger.error(f"❌ Webhook processing error: {str(e)}")
-            return {'success': False, 'error': str(e)}
+            logger.error("❌ Webhook processing error: %s", e)
+            if delivery_key:
+                try:
+                    await message_broker.redis_client.delete(delivery_key)
+                except Exception:
+                    pass
+            raise
+    
+    def _delivery_key(self, source: str, data: Dict[str, Any], delivery_id: Optional[str] = None) -> str:
+        """
+        Redis key for a delivery: the sender's delivery or event id, or a hash of the payload
+        
+        A payload's 'id' is usually the candidate's or job's id rather than the
+        delivery's, so it is not used; distinct events about the same entity
+        must not be taken for retries of one another.
+        """
+        event_id = delivery_id or data.get('event_id')
+        if not event_id:
+            event_id = hashlib.sha256(orjson.dumps(data, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        return f"{WEBHOOK_DELIVERY_PREFIX}:{source}:{event_id}"
     
-    async def _handle_job_application(self, data: Dict[str, Any], db: Session, source: str) -> Dict[str, Any]:
+    async def _previous_result(self, delivery_key: str) -> Optional[Dict[str, Any]]:
+        """Result recorded for an already-seen delivery, or None if it is still in flight"""
+        cached = await message_broker.redis_client.get(delivery_key)
+        if not cached:
+            return None
+        logger.info("🔁 Duplicate webhook delivery skipped: %s", delivery_key)
+        return {**orjson.loads(cached), 'duplicate': True}
+    
+    async def _handle_job_application(self, data: Dict[str, Any], db: AsyncSession, source: str) -> Dict[str, Any]:
         """Handle new job application webhook"""
         try:
             # Extract candidate information
@@ -97,12 +279,12 @@ class WebhookProcessor:
             if not candidate_email:
                 return {'success': False, 'error': 'No candidate email provided'}
             
-            existing_candidate = db.query(Candidate).filter(
-                Candidate.email == candidate_email
-            ).first()
+            existing_candidate = (await db.execute(
+                select(Candidate).where(Candidate.email == candidate_email)
+            )).scalar_one_or_none()
             
             if existing_candidate:
-                logger.info(f"Candidate {candidate_email} already exists")
+                logger.info("Candidate %s already exists", candidate_email)
                 return {
                     'success': True,
                     'candidate_id': str(existing_candidate.id),
@@ -125,22 +307,19 @@ class WebhookProcessor:
                 candidate.resume_filename = resume_data.get('filename')
             
             db.add(candidate)
-            db.commit()
-            db.refresh(candidate)
+            await db.commit()
+            await db.refresh(candidate)
             
-            # Trigger AI analysis if resume text is available
+            # Queue AI analysis if resume text is available; the LLM call runs
+            # in the background so the delivery is acknowledged without waiting on it
             if candidate.resume_text:
-                try:
-                    job_position = None
-                    if job_info.get('id'):
-                        job_position = db.query(JobPosition).filter(
-                            JobPosition.id == job_info['id']
-                        ).first()
-                    
-                    await resume_analyzer.analyze_resume(candidate, job_position)
-                    
-                except Exception as e:
-                    logger.warning(f"Resume analysis failed: {str(e)}")
+                job_position = None
+                if job_info.get('id'):
+                    job_position = (await db.execute(
+                        select(JobPosition).where(JobPosition.id == job_info['id'])
+                    )).scalar_one_or_none()
+                
+                self._track(asyncio.create_task(self._analyze_candidate(candidate, job_position)))
             
             return {
                 'success': True,
@@ -148,11 +327,12 @@ class WebhookProcessor:
                 'message': 'Job application processed successfully'
             }
             
-        except Exception as e:
-            db.rollback()
-            return {'success': False, 'error': str(e)}
+        except Exception:
+            # Raised so the worker retries the delivery
+            await db.rollback()
+            raise
     
-    async def _handle_job_posted(self, data: Dict[str, Any], db: Session, source: str) -> Dict[str, Any]:
+    async def _handle_job_posted(self, data: Dict[str, Any], db: AsyncSession, source: str) -> Dict[str, Any]:
         """Handle new job posting webhook"""
         try:
             # Extract job information
@@ -165,12 +345,12 @@ class WebhookProcessor:
             existing_job = None
             if job_external_id:
                 # Check by external ID if provided
-                existing_job = db.query(JobPosition).filter(
-                    JobPosition.hiring_manager.contains(job_external_id)
-                ).first()
+                existing_job = (await db.execute(
+                    select(JobPosition).where(JobPosition.hiring_manager == _external_job_ref(source, job_external_id))
+                )).scalars().first()
             
             if existing_job:
-                logger.info(f"Job {job_title} already exists")
+                logger.info("Job %s already exists", job_title)
                 return {
                     'success': True,
                     'job_id': str(existing_job.id),
@@ -189,14 +369,14 @@ class WebhookProcessor:
                 salary_min=job_data.get('salary_min'),
                 salary_max=job_data.get('salary_max'),
                 status='open',
-                hiring_manager=f'{source}:{job_external_id}' if job_external_id else f'Webhook from {source}'
+                hiring_manager=_external_job_ref(source, job_external_id) if job_external_id else f'Webhook from {source}'
             )
             
             db.add(job_position)
-            db.commit()
-            db.refresh(job_position)
+            await db.commit()
+            await db.refresh(job_position)
             
-            logger.info(f"New job created: {job_title}")
+            logger.info("New job created: %s", job_title)
             
             return {
                 'success': True,
@@ -204,11 +384,12 @@ class WebhookProcessor:
                 'message': 'Job posted successfully'
             }
             
-        except Exception as e:
-            db.rollback()
-            return {'success': False, 'error': str(e)}
+        except Exception:
+            # Raised so the worker retries the delivery
+            await db.rollback()
+            raise
     
-    async def _handle_job_updated(self, data: Dict[str, Any], db: Session, source: str) -> Dict[str, Any]:
+    async def _handle_job_updated(self, data: Dict[str, Any], db: AsyncSession, source: str) -> Dict[str, Any]:
         """Handle job update webhook"""
         try:
             job_data = data.get('job', {})
@@ -218,9 +399,9 @@ class WebhookProcessor:
                 return {'success': False, 'error': 'No external job ID provided'}
             
             # Find existing job
-            job = db.query(JobPosition).filter(
-                JobPosition.hiring_manager.contains(job_external_id)
-            ).first()
+            job = (await db.execute(
+                select(JobPosition).where(JobPosition.hiring_manager == _external_job_ref(source, job_external_id))
+            )).scalars().first()
             
             if not job:
                 return {'success': False, 'error': 'Job not found'}
@@ -235,7 +416,7 @@ class WebhookProcessor:
             if 'required_skills' in job_data:
                 job.required_skills = job_data['required_skills']
             
-            db.commit()
+            await db.commit()
             
             return {
                 'success': True,
@@ -243,11 +424,12 @@ class WebhookProcessor:
                 'message': 'Job updated successfully'
             }
             
-        except Exception as e:
-            db.rollback()
-            return {'success': False, 'error': str(e)}
+        except Exception:
+            # Raised so the worker retries the delivery
+            await db.rollback()
+            raise
     
-    async def _handle_interview_scheduled(self, data: Dict[str, Any], db: Session, source: str) -> Dict[str, Any]:
+    async def _handle_interview_scheduled(self, data: Dict[str, Any], db: AsyncSession, source: str) -> Dict[str, Any]:
         """Handle interview scheduled webhook"""
         try:
             # This would handle external interview scheduling notifications
@@ -271,7 +453,7 @@ class WebhookProcessor:
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
-    async def _handle_candidate_status_change(self, data: Dict[str, Any], db: Session, source: str) -> Dict[str, Any]:
+    async def _handle_candidate_status_change(self, data: Dict[str, Any], db: AsyncSession, source: str) -> Dict[str, Any]:
         """Handle candidate status change webhook"""
         try:
             candidate_email = data.get('candidate_email')
@@ -281,9 +463,9 @@ class WebhookProcessor:
                 return {'success': False, 'error': 'Missing candidate email or status'}
             
             # Find and update candidate
-            candidate = db.query(Candidate).filter(
-                Candidate.email == candidate_email
-            ).first()
+            candidate = (await db.execute(
+                select(Candidate).where(Candidate.email == candidate_email)
+            )).scalar_one_or_none()
             
             if not candidate:
                 return {'success': False, 'error': 'Candidate not found'}
@@ -291,7 +473,7 @@ class WebhookProcessor:
             candidate.status = new_status
             candidate.human_review_notes = f'Status updated via {source} webhook'
             
-            db.commit()
+            await db.commit()
             
             return {
                 'success': True,
@@ -299,32 +481,36 @@ class WebhookProcessor:
                 'message': 'Candidate status updated'
             }
             
-        except Exception as e:
-            db.rollback()
-            return {'success': False, 'error': str(e)}
+        except Exception:
+            # Raised so the worker retries the delivery
+            await db.rollback()
+            raise
+    
+    def _candidate_from_form(self, form_data: Dict[str, Any], source: str) -> Candidate:
+        """Build a candidate from career form fields"""
+        candidate = Candidate(
+            name=form_data.get('name'),
+            email=form_data.get('email'),
+            phone=form_data.get('phone'),
+            status='new',
+            human_review_notes=f'Applied via {source} career form'
+        )
+        
+        # Handle additional form fields
+        if 'cover_letter' in form_data:
+            candidate.resume_text = form_data['cover_letter']
+        
+        return candidate
     
-    async def _handle_form_submission(self, data: Dict[str, Any], db: Session, source: str) -> Dict[str, Any]:
+    async def _handle_form_submission(self, data: Dict[str, Any], db: AsyncSession, source: str) -> Dict[str, Any]:
         """Handle career website form submission"""
         try:
-            # Extract form data
-            form_data = data.get('form_data', {})
-            
             # Create candidate from form submission
-            candidate = Candidate(
-                name=form_data.get('name'),
-                email=form_data.get('email'),
-                phone=form_data.get('phone'),
-                status='new',
-                human_review_notes=f'Applied via {source} career form'
-            )
-            
-            # Handle additional form fields
-            if 'cover_letter' in form_data:
-                candidate.resume_text = form_data['cover_letter']
+            candidate = self._candidate_from_form(data.get('form_data', {}), source)
             
             db.add(candidate)
-            db.commit()
-            db.refresh(candidate)
+            await db.commit()
+            await db.refresh(candidate)
             
             return {
                 'success': True,
@@ -332,21 +518,400 @@ class WebhookProcessor:
                 'message': 'Form submission processed'
             }
             
-        except Exception as e:
-            db.rollback()
-            return {'success': False, 'error': str(e)}
+        except Exception:
+            # Raised so the worker retries the delivery
+            await db.rollback()
+            raise
+    
+    async def process_form_submissions(self, submissions: List[Tuple[str, Dict[str, Any], Optional[str]]],
+                                       db: AsyncSession) -> List[Dict[str, Any]]:
+        """
+        Create candidates for a burst of form submissions in one transaction
+        
+        Duplicate deliveries are skipped, and emails that already belong to a
+        candidate are checked with a single query instead of one per submission.
+        
+        Args:
+            submissions: (source, data, delivery id) triples read from the webhook stream
+            db: Session the candidates are committed on
+            
+        Returns:
+            One result per submission, in order; None for submissions another
+            worker is still processing, which should be left pending
+        
+        Raises:
+            Exception: If the commit fails; nothing is recorded, so the batch can be retried
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(submissions)
+        delivery_keys: Dict[int, str] = {}
+        in_progress = set()
+        
+        if message_broker.connected:
+            keys = [
+                self._delivery_key(source, data, delivery_id)
+                for source, data, delivery_id in submissions
+            ]
+            async with message_broker.redis_client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.set(key, '', nx=True, ex=WEBHOOK_DELIVERY_LOCK_TTL)
+                claimed = await pipe.execute()
+            for i, (key, is_new) in enumerate(zip(keys, claimed)):
+                if is_new:
+                    delivery_keys[i] = key
+                else:
+                    results[i] = await self._previous_result(key)
+                    if results[i] is None:
+                        in_progress.add(i)
+        
+        pending = [i for i, result in enumerate(results) if result is None and i not in in_progress]
+        if not pending:
+            return results
+        
+        try:
+            emails = {submissions[i][1].get('form_data', {}).get('email') for i in pending} - {None}
+            existing: Dict[str, Any] = {}
+            if emails:
+                rows = await db.execute(
+                    select(Candidate.email, Candidate.id).where(Candidate.email.in_(emails))
+                )
+                existing = {email: candidate_id for email, candidate_id in rows}
+            
+            created = []
+            batch_emails = set()
+            batch_duplicates = []
+            for i in pending:
+                source, data, _ = submissions[i]
+                form_data = data.get('form_data', {})
+                email = form_data.get('email')
+                if email in existing:
+                    results[i] = {
+                        'success': True,
+                        'candidate_id': str(existing[email]),
+                        'message': 'Candidate already exists'
+                    }
+                    continue
+                
+                if email in batch_emails:
+                    batch_duplicates.append(i)
+                    continue
+                
+                if email:
+                    batch_emails.add(email)
+                created.append((i, self._candidate_from_form(form_data, source)))
+            
+            db.add_all([candidate for _, candidate in created])
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            if delivery_keys:
+                await message_broker.redis_client.delete(*delivery_keys.values())
+            raise
+        
+        for i, candidate in created:
+            existing[candidate.email] = candidate.id
+            results[i] = {
+                'success': True,
+                'candidate_id': str(candidate.id),
+                'message': 'Form submission processed'
+            }
+        # Repeats within the batch point at the candidate created for the first one
+        for i in batch_duplicates:
+            email = submissions[i][1].get('form_data', {}).get('email')
+            results[i] = {
+                'success': True,
+                'candidate_id': str(existing[email]),
+                'message': 'Candidate already exists'
+            }
+        
+        if delivery_keys:
+            async with message_broker.redis_client.pipeline(transaction=False) as pipe:
+                for i, key in delivery_keys.items():
+                    pipe.set(key, orjson.dumps(results[i]), ex=WEBHOOK_DELIVERY_TTL)
+                await pipe.execute()
+        
+        logger.info("✅ Processed %s form submissions (%s new candidates)", len(pending), len(created))
+        return results
+
+    async def _analyze_candidate(self, candidate: Candidate, job_position: Optional[JobPosition]) -> None:
+        """Run AI analysis for a candidate who applied through a webhook"""
+        if self._analysis_limiter is None:
+            self._analysis_limiter = HostRateLimiter(
+                requests_per_second=WEBHOOK_ANALYSIS_REQUESTS_PER_SECOND,
+                burst=settings.max_concurrent_processing,
+                max_concurrency=settings.max_concurrent_processing
+            )
+        
+        async with self._analysis_limiter.acquire():
+            try:
+                await resume_analyzer.analyze_resume(candidate, job_position)
+            except Exception as e:
+                logger.warning("Resume analysis failed for %s: %s", candidate.id, e)
+    
+    def _track(self, task: asyncio.Task) -> None:
+        """Keep a reference to a background task until it finishes"""
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def close(self) -> None:
+        """Wait for background resume analyses started by webhook handlers"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
 
 # Initialize webhook processor
 webhook_processor = WebhookProcessor()
 
+def _delivery_id(request: Request) -> Optional[str]:
+    """The sender's delivery id header, if it sends one"""
+    for header in WEBHOOK_DELIVERY_ID_HEADERS:
+        value = request.headers.get(header)
+        if value:
+            return value
+    return None
+
+async def _dispatch_webhook(source: str, event_type: str, data: Dict[str, Any], db: AsyncSession,
+                            delivery_id: Optional[str] = None) -> ORJSONResponse:
+    """
+    Queue a verified webhook event for the worker pool
+    
+    Falls back to processing inline when Redis is unavailable (Phase 1 mock mode).
+    """
+    if not message_broker.connected:
+        result = await webhook_processor.process_webhook(source, event_type, data, db, delivery_id)
+        return ORJSONResponse(content=result, status_code=200)
+    
+    event_id = await message_broker.redis_client.xadd(WEBHOOK_STREAM, {
+        'source': source,
+        'event_type': event_type or '',
+        'delivery_id': delivery_id or '',
+        'data': orjson.dumps(data)
+    })
+    
+    return ORJSONResponse(
+        content={'success': True, 'queued': True, 'event_id': event_id},
+        status_code=202
+    )
+
+def _retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter before in-process retry number attempt + 1"""
+    return min(WEBHOOK_RETRY_BASE_DELAY * 2 ** attempt, WEBHOOK_RETRY_MAX_DELAY) + random.uniform(0, WEBHOOK_RETRY_JITTER)
+
+async def _process_webhook_entry(event_id: str, fields: Dict[str, Any], data: Dict[str, Any],
+                                 db: AsyncSession, delivery: int) -> None:
+    """
+    Process one stream entry, retrying transient failures with backoff
+    
+    Acks the entry once it is handled. If every attempt fails it is left
+    pending for the reclaimer, or dead-lettered on its final delivery.
+    """
+    redis_client = message_broker.redis_client
+    for attempt in range(WEBHOOK_RETRY_ATTEMPTS):
+        try:
+            await webhook_processor.process_webhook(
+                fields['source'],
+                fields['event_type'] or None,
+                data,
+                db,
+                fields.get('delivery_id') or None
+            )
+            await redis_client.xack(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, event_id)
+            return
+        except WebhookDeliveryInProgress:
+            # Left pending: the reclaimer retries it once the marker has expired
+            logger.info("⏳ Webhook event %s is still in flight elsewhere", event_id)
+            return
+        except Exception as e:
+            await db.rollback()
+            error = e
+            if attempt + 1 < WEBHOOK_RETRY_ATTEMPTS:
+                await asyncio.sleep(_retry_delay(attempt))
+    
+    logger.error("❌ Webhook event %s failed after %s attempts: %s", event_id, WEBHOOK_RETRY_ATTEMPTS, error)
+    if delivery >= WEBHOOK_MAX_DELIVERIES:
+        await _dead_letter_webhook(event_id, delivery, fields, error)
+
+async def _process_webhook_entries(consumer_name: str, entries: List[Any],
+                                   deliveries: Optional[Dict[str, int]] = None) -> None:
+    """
+    Process stream entries, acking each one that was handled
+    
+    Args:
+        consumer_name: Consumer the entries were delivered to
+        entries: (event id, fields) pairs from XREADGROUP or XCLAIM
+        deliveries: Delivery count per event id for reclaimed entries (new entries are on their first)
+    """
+    redis_client = message_broker.redis_client
+    deliveries = deliveries or {}
+    async with AsyncSessionLocal() as db:
+        form_submissions = []
+        for event_id, fields in entries:
+            if not fields:
+                # Trimmed from the stream while pending; nothing left to process
+                await redis_client.xack(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, event_id)
+                continue
+            try:
+                data = orjson.loads(fields['data'])
+            except Exception as e:
+                # Retrying won't make a malformed payload parse
+                await _dead_letter_webhook(event_id, deliveries.get(event_id, 1), fields, e)
+                continue
+            
+            if fields['event_type'] == 'form_submission':
+                # Collected and committed together below
+                form_submissions.append((event_id, fields, data))
+                continue
+            
+            await _process_webhook_entry(event_id, fields, data, db, deliveries.get(event_id, 1))
+        
+        if form_submissions:
+            try:
+                results = await webhook_processor.process_form_submissions(
+                    [
+                        (fields['source'], data, fields.get('delivery_id') or None)
+                        for _, fields, data in form_submissions
+                    ],
+                    db
+                )
+            except Exception as e:
+                # Fall back to one at a time so a single bad submission can't sink the rest
+                logger.error("❌ Form submission batch failed on %s: %s", consumer_name, e)
+                for event_id, fields, data in form_submissions:
+                    await _process_webhook_entry(event_id, fields, data, db, deliveries.get(event_id, 1))
+                return
+            handled = [
+                event_id for (event_id, _, _), result in zip(form_submissions, results)
+                if result is not None
+            ]
+            if handled:
+                await redis_client.xack(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, *handled)
+
+async def _webhook_worker(consumer_name: str) -> None:
+    """Consume queued webhook events and process them"""
+    redis_client = message_broker.redis_client
+    
+    while True:
+        try:
+            batches = await redis_client.xreadgroup(
+                WEBHOOK_CONSUMER_GROUP,
+                consumer_name,
+                {WEBHOOK_STREAM: '>'},
+                count=WEBHOOK_READ_COUNT,
+                block=WEBHOOK_BLOCK_MS
+            )
+            for _, entries in batches:
+                await _process_webhook_entries(consumer_name, entries)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("❌ Webhook queue read error: %s", e)
+            await asyncio.sleep(1)
+
+async def _dead_letter_webhook(event_id: str, deliveries: int, fields: Optional[Dict[str, Any]] = None,
+                               error: Optional[Exception] = None) -> None:
+    """Move an entry to the dead-letter stream and ack it on the main stream"""
+    redis_client = message_broker.redis_client
+    if fields is None:
+        entries = await redis_client.xrange(WEBHOOK_STREAM, event_id, event_id)
+        fields = entries[0][1] if entries else None
+    if fields:
+        await redis_client.xadd(WEBHOOK_DLQ_STREAM, {
+            **fields,
+            'event_id': event_id,
+            'deliveries': deliveries,
+            'error': str(error) if error else 'worker stopped while processing'
+        })
+    await redis_client.xack(WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, event_id)
+    logger.warning("⚠️  Webhook event %s dead-lettered after %s deliveries", event_id, deliveries)
+
+async def _webhook_reclaimer(consumer_name: str) -> None:
+    """Retry stale pending webhook events and dead-letter the ones that keep failing"""
+    redis_client = message_broker.redis_client
+    
+    while True:
+        await asyncio.sleep(WEBHOOK_RECLAIM_INTERVAL)
+        try:
+            pending = await redis_client.xpending_range(
+                WEBHOOK_STREAM,
+                WEBHOOK_CONSUMER_GROUP,
+                min='-',
+                max='+',
+                count=WEBHOOK_READ_COUNT,
+                idle=WEBHOOK_RECLAIM_IDLE_MS
+            )
+            exhausted = {}
+            retries = {}
+            for entry in pending:
+                if entry['times_delivered'] >= WEBHOOK_MAX_DELIVERIES:
+                    exhausted[entry['message_id']] = entry['times_delivered']
+                else:
+                    # XCLAIM counts as another delivery
+                    retries[entry['message_id']] = entry['times_delivered'] + 1
+            
+            if exhausted:
+                # Claim before dead-lettering: XCLAIM resets the idle time, so when
+                # several processes reclaim at once only one of them gets each entry
+                claimed = await redis_client.xclaim(
+                    WEBHOOK_STREAM,
+                    WEBHOOK_CONSUMER_GROUP,
+                    consumer_name,
+                    WEBHOOK_RECLAIM_IDLE_MS,
+                    list(exhausted)
+                )
+                for event_id, fields in claimed:
+                    await _dead_letter_webhook(event_id, exhausted[event_id], fields or {})
+            
+            if retries:
+                claimed = await redis_client.xclaim(
+                    WEBHOOK_STREAM,
+                    WEBHOOK_CONSUMER_GROUP,
+                    consumer_name,
+                    WEBHOOK_RECLAIM_IDLE_MS,
+                    list(retries)
+                )
+                await _process_webhook_entries(consumer_name, claimed, retries)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("❌ Webhook reclaim error: %s", e)
+
+async def start_webhook_workers(concurrency: int = WEBHOOK_WORKER_COUNT) -> List[asyncio.Task]:
+    """
+    Start the webhook consumer pool (no-op when Redis is unavailable)
+    
+    Returns:
+        Worker tasks; cancel them on shutdown
+    """
+    if not message_broker.connected:
+        return []
+    
+    try:
+        await message_broker.redis_client.xgroup_create(
+            WEBHOOK_STREAM, WEBHOOK_CONSUMER_GROUP, id='0', mkstream=True
+        )
+    except Exception as e:
+        # BUSYGROUP: the group already exists
+        if 'BUSYGROUP' not in str(e):
+            raise
+    
+    # PIDs repeat across containers, so the host name keeps consumer names unique in the group
+    prefix = f"{socket.gethostname()}-{os.getpid()}"
+    logger.info("🔗 Starting %s webhook workers", concurrency)
+    workers = [
+        asyncio.create_task(_webhook_worker(f"{prefix}-{i}"))
+        for i in range(concurrency)
+    ]
+    workers.append(asyncio.create_task(_webhook_reclaimer(f"{prefix}-reclaim")))
+    return workers
+
 # Webhook endpoints
 @webhook_router.post("/indeed")
 async def indeed_webhook(
     request: Request,
     x_indeed_signature: str = Header(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle Indeed webhook events"""
+    await _enforce_rate_limit('indeed')
+    
     try:
         body = await request.body()
         
@@ -358,26 +923,24 @@ async def indeed_webhook(
                 raise HTTPException(status_code=401, detail="Invalid signature")
         
         # Parse event data
-        event_data = json.loads(body)
+        event_data = orjson.loads(body)
         event_type = event_data.get('event_type')
         
-        result = await webhook_processor.process_webhook(
-            'indeed', event_type, event_data, db
-        )
-        
-        return JSONResponse(content=result, status_code=200)
+        return await _dispatch_webhook('indeed', event_type, event_data, db, _delivery_id(request))
         
     except Exception as e:
-        logger.error(f"Indeed webhook error: {str(e)}")
+        logger.error("Indeed webhook error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @webhook_router.post("/linkedin")
 async def linkedin_webhook(
     request: Request,
     x_linkedin_signature: str = Header(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle LinkedIn webhook events"""
+    await _enforce_rate_limit('linkedin')
+    
     try:
         body = await request.body()
         
@@ -389,26 +952,24 @@ async def linkedin_webhook(
                 raise HTTPException(status_code=401, detail="Invalid signature")
         
         # Parse event data
-        event_data = json.loads(body)
+        event_data = orjson.loads(body)
         event_type = event_data.get('event_type')
         
-        result = await webhook_processor.process_webhook(
-            'linkedin', event_type, event_data, db
-        )
-        
-        return JSONResponse(content=result, status_code=200)
+        return await _dispatch_webhook('linkedin', event_type, event_data, db, _delivery_id(request))
         
     except Exception as e:
-        logger.error(f"LinkedIn webhook error: {str(e)}")
+        logger.error("LinkedIn webhook error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @webhook_router.post("/workday")
 async def workday_webhook(
     request: Request,
     x_workday_signature: str = Header(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle Workday ATS webhook events"""
+    await _enforce_rate_limit('workday')
+    
     try:
         body = await request.body()
         
@@ -420,26 +981,24 @@ async def workday_webhook(
                 raise HTTPException(status_code=401, detail="Invalid signature")
         
         # Parse event data
-        event_data = json.loads(body)
+        event_data = orjson.loads(body)
         event_type = event_data.get('event_type')
         
-        result = await webhook_processor.process_webhook(
-            'workday', event_type, event_data, db
-        )
-        
-        return JSONResponse(content=result, status_code=200)
+        return await _dispatch_webhook('workday', event_type, event_data, db, _delivery_id(request))
         
     except Exception as e:
-        logger.error(f"Workday webhook error: {str(e)}")
+        logger.error("Workday webhook error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @webhook_router.post("/career-site")
 async def career_site_webhook(
     request: Request,
     x_career_signature: str = Header(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle career website form submissions"""
+    await _enforce_rate_limit('career_site')
+    
     try:
         body = await request.body()
         
@@ -451,16 +1010,12 @@ async def career_site_webhook(
                 raise HTTPException(status_code=401, detail="Invalid signature")
         
         # Parse form data
-        form_data = json.loads(body)
+        form_data = orjson.loads(body)
         
-        result = await webhook_processor.process_webhook(
-            'career_site', 'form_submission', form_data, db
-        )
-        
-        return JSONResponse(content=result, status_code=200)
+        return await _dispatch_webhook('career_site', 'form_submission', form_data, db, _delivery_id(request))
         
     except Exception as e:
-        logger.error(f"Career site webhook error: {str(e)}")
+        logger.error("Career site webhook error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @webhook_router.post("/generic")
@@ -469,9 +1024,11 @@ async def generic_webhook(
     source: str = Header(..., alias="X-Source"),
     event_type: str = Header(..., alias="X-Event-Type"),
     signature: str = Header(None, alias="X-Signature"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle generic webhook events from any source"""
+    await _enforce_rate_limit(source)
+    
     try:
         body = await request.body()
         
@@ -483,25 +1040,29 @@ async def generic_webhook(
                 raise HTTPException(status_code=401, detail="Invalid signature")
         
         # Parse event data
-        event_data = json.loads(body)
-        
-        result = await webhook_processor.process_webhook(
-            source, event_type, event_data, db
-        )
+        event_data = orjson.loads(body)
         
-        return JSONResponse(content=result, status_code=200)
+        return await _dispatch_webhook(source, event_type, event_data, db, _delivery_id(request))
         
     except Exception as e:
-        logger.error(f"Generic webhook error: {str(e)}")
+        logger.error("Generic webhook error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Health check for webhooks
 @webhook_router.get("/health")
 async def webhook_health():
     """Health check endpoint for webhook service"""
+    dead_letters = None
+    if message_broker.connected:
+        try:
+            dead_letters = await message_broker.redis_client.xlen(WEBHOOK_DLQ_STREAM)
+        except Exception as e:
+            logger.warning("⚠️  Could not read webhook dead-letter depth: %s", e)
+    
     return {
         "status": "healthy",
         "service": "webhooks",
         "timestamp": datetime.utcnow().isoformat(),
-        "supported_sources": list(WEBHOOK_SECRETS.keys())
+        "supported_sources": list(WEBHOOK_SECRETS.keys()),
+        "dead_letter_depth": dead_letters
     } 
\ No newline at end of file
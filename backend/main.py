@@ -5,14 +5,19 @@ AI-Powered Recruitment Assistant with Multi-Agent System
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import uvicorn
+import asyncio
+import logging
+import os
+import sys
 from contextlib import asynccontextmanager
 
 # Import core modules
 from core.config import settings
-from core.database import init_db
+from core.database import init_db, async_engine
 from core.message_broker import message_broker
+from core.ai_clients import close_async_clients, warm_async_clients
 
 # Import API routes - Phase 1, 2, 3, 4 implementation
 from api.candidates import router as candidates_router
@@ -22,7 +27,10 @@ from api.communication import router as communication_router
 from api.dashboard import router as dashboard_router
 
 # Import integration routes
-from integrations.webhooks import webhook_router
+from integrations.webhooks import webhook_router, webhook_processor, start_webhook_workers
+from services.file_processor import shutdown_parse_executor
+
+logger = logging.getLogger(__name__)
 
 # Application metadata
 app_metadata = {
@@ -52,6 +60,12 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"ℹ️  Message broker using mock mode: {e}")
     
+    # Open the OpenAI connection now so the first analysis skips the handshake
+    await warm_async_clients()
+    
+    # Consume queued webhook deliveries (only when Redis is available)
+    webhook_workers = await start_webhook_workers()
+    
     print("🤖 Loading AI agents...")
     # Initialize Resume Analyzer Agent
     from agents.resume_analyzer import resume_analyzer
@@ -78,15 +92,31 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("🛑 Shutting down RecruitAI Pro...")
+    for worker in webhook_workers:
+        worker.cancel()
+    await asyncio.gather(*webhook_workers, return_exceptions=True)
+    await webhook_processor.close()
     await message_broker.disconnect()
+    await close_async_clients()
+    await async_engine.dispose()
+    shutdown_parse_executor()
     print("✅ Shutdown complete")
 
+class BrowserCORSMiddleware(CORSMiddleware):
+    """CORS for browser-facing routes; server-to-server webhook deliveries skip it"""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(webhook_router.prefix):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
 # Create FastAPI application
 app = FastAPI(lifespan=lifespan, **app_metadata)
 
 # Configure CORS
 app.add_middleware(
-    CORSMiddleware,
+    BrowserCORSMiddleware,
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
     allow_credentials=True,
     allow_methods=["*"],
@@ -172,9 +202,11 @@ app.include_router(webhook_router, tags=["Integrations"])  # Real-time webhooks
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
-    return JSONResponse(
+    logger.error("❌ Unhandled error on %s %s: %s", request.method, request.url.path, exc)
+    return ORJSONResponse(
         status_code=500,
         content={
+            "success": False,
             "error": "Internal server error",
             "message": "An unexpected error occurred",
             "detail": str(exc) if app.debug else "Contact support for assistance"
@@ -182,5 +214,19 @@ async def global_exception_handler(request, exc):
     )
 
 if __name__ == "__main__":
-    print("🚀 Starting RecruitAI Pro development server...")
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    if settings.is_development:
+        print("🚀 Starting RecruitAI Pro development server...")
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    else:
+        # uvloop and httptools ship with uvicorn[standard]; reload can't be combined with workers
+        workers = max(2, os.cpu_count() or 1)
+        print(f"🚀 Starting RecruitAI Pro with {workers} workers...")
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            workers=workers,
+            loop="uvloop" if sys.platform != "win32" else "asyncio",
+            http="httptools",
+            log_level="info"
+        )
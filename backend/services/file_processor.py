@@ -5,9 +5,11 @@ Handles PDF and DOCX resume text extraction with error handling and validation
 
 import os
 import re
+import asyncio
 import mimetypes
 import tempfile
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Tuple, Dict, Any
 from pathlib import Path
 
@@ -15,9 +17,38 @@ import PyPDF2
 from docx import Document
 from fastapi import HTTPException, UploadFile
 
+try:
+    import fitz  # PyMuPDF (AGPL, optional: pip install -r requirements-pdf.txt)
+except ImportError:
+    fitz = None
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Contact detail patterns, compiled once for every resume processed
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_RE = re.compile(r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+LINKEDIN_RE = re.compile(r'linkedin\.com/in/[a-zA-Z0-9-]+', re.IGNORECASE)
+
+# Text extraction is CPU-bound, so it runs in worker processes where it can't
+# stall the event loop and several resumes parse on separate cores
+PARSE_MAX_WORKERS = min(os.cpu_count() or 1, 6)
+_parse_executor: Optional[ProcessPoolExecutor] = None
+
+def _get_parse_executor() -> ProcessPoolExecutor:
+    """Return the shared parsing process pool, starting it on first use"""
+    global _parse_executor
+    if _parse_executor is None:
+        _parse_executor = ProcessPoolExecutor(max_workers=PARSE_MAX_WORKERS)
+    return _parse_executor
+
+def shutdown_parse_executor() -> None:
+    """Stop the parsing worker processes (called on application shutdown)"""
+    global _parse_executor
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=False, cancel_futures=True)
+        _parse_executor = None
+
 class FileProcessor:
     """
     Service for processing uploaded resume files
@@ -68,7 +99,7 @@ class FileProcessor:
             
             try:
                 # Extract text based on file type
-                extracted_text = self._extract_text_from_file(file_path, file.filename)
+                extracted_text = await self._extract_text_from_file(file_path, file.filename)
                 
                 # Validate extracted text
                 self._validate_extracted_text(extracted_text)
@@ -162,21 +193,24 @@ class FileProcessor:
             logger.error(f"Error saving file {file.filename}: {str(e)}")
             raise HTTPException(status_code=500, detail="Error saving uploaded file")
     
-    def _extract_text_from_file(self, file_path: Path, filename: str) -> str:
-        """Extract text from file based on its type"""
+    async def _extract_text_from_file(self, file_path: Path, filename: str) -> str:
+        """Extract text from file based on its type (in the parsing process pool)"""
         
         file_extension = file_path.suffix.lower()
         
         try:
             if file_extension == '.pdf':
-                return self._extract_text_from_pdf(file_path)
+                parse = self._extract_text_from_pdf
             elif file_extension in ['.docx', '.doc']:
-                return self._extract_text_from_docx(file_path)
+                parse = self._extract_text_from_docx
             else:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Unsupported file type: {file_extension}"
                 )
+            
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_get_parse_executor(), parse, file_path)
         except Exception as e:
             logger.error(f"Error extracting text from {filename}: {str(e)}")
             raise HTTPException(
@@ -184,8 +218,35 @@ class FileProcessor:
                 detail=f"Could not extract text from file. File may be corrupted or password-protected."
             )
     
-    def _extract_text_from_pdf(self, file_path: Path) -> str:
+    @staticmethod
+    def _extract_text_from_pdf(file_path: Path) -> str:
         """Extract text from PDF file"""
+        # PyMuPDF extracts text roughly 10x faster than PyPDF2; PyPDF2 is used
+        # when PyMuPDF isn't installed or can't open the file
+        if fitz is None:
+            return FileProcessor._extract_text_from_pdf_pypdf2(file_path)
+        
+        try:
+            with fitz.open(file_path) as doc:
+                # Check if PDF is encrypted
+                if doc.needs_pass:
+                    raise ValueError("PDF is password-protected")
+                
+                text_content = [page_text for page_text in (page.get_text() for page in doc) if page_text.strip()]
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.warning(f"PyMuPDF could not read {file_path.name}, retrying with PyPDF2: {str(e)}")
+            return FileProcessor._extract_text_from_pdf_pypdf2(file_path)
+        
+        if not text_content:
+            raise ValueError("No text content found in PDF")
+        
+        return '\n\n'.join(text_content)
+    
+    @staticmethod
+    def _extract_text_from_pdf_pypdf2(file_path: Path) -> str:
+        """Extract text from PDF file with PyPDF2"""
         text_content = []
         
         with open(file_path, 'rb') as file:
@@ -210,7 +271,8 @@ class FileProcessor:
         
         return '\n\n'.join(text_content)
     
-    def _extract_text_from_docx(self, file_path: Path) -> str:
+    @staticmethod
+    def _extract_text_from_docx(file_path: Path) -> str:
         """Extract text from DOCX file"""
         text_content = []
         
@@ -317,20 +379,17 @@ class FileProcessor:
         }
         
         # Email pattern
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, text)
+        email_match = EMAIL_RE.search(text)
         if email_match:
             contact_info["email"] = email_match.group()
         
         # Phone pattern (various formats)
-        phone_pattern = r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phone_match = re.search(phone_pattern, text)
+        phone_match = PHONE_RE.search(text)
         if phone_match:
             contact_info["phone"] = phone_match.group()
         
         # LinkedIn pattern
-        linkedin_pattern = r'linkedin\.com/in/[a-zA-Z0-9-]+'
-        linkedin_match = re.search(linkedin_pattern, text, re.IGNORECASE)
+        linkedin_match = LINKEDIN_RE.search(text)
         if linkedin_match:
             contact_info["linkedin"] = linkedin_match.group()
         
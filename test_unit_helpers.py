@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Unit tests for RecruitAI Pro helper logic
+Covers the pure pieces of the backend that don't need a running server:
+slot overlap detection, job board rate limiting, IMAP FETCH parsing,
+resume contact extraction and webhook delivery keys.
+
+Run from the repository root with the backend requirements installed:
+    python -m pytest -q test_unit_helpers.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from agents.scheduler import scheduler_agent, SchedulingRequest, InterviewType
+from integrations.job_boards import HostRateLimiter
+from integrations.resume_sources import resume_source_integrator
+from integrations.webhooks import webhook_processor
+
+# A Monday, so every test slot below falls inside working hours
+MONDAY = datetime(2026, 10, 19)
+INTERVIEWER = "interviewer@example.com"
+
+
+def make_request(start: datetime, end: datetime, duration_minutes: int = 60) -> SchedulingRequest:
+    """Scheduling request for a single interviewer"""
+    return SchedulingRequest(
+        candidate_id="candidate-1",
+        job_position_id="job-1",
+        interview_type=InterviewType("video_call"),
+        interviewer_emails=[INTERVIEWER],
+        duration_minutes=duration_minutes,
+        earliest_start=start,
+        latest_end=end
+    )
+
+
+def busy_slot(start: datetime, end: datetime, email: str = INTERVIEWER) -> SimpleNamespace:
+    """Stand-in for an AvailabilitySlot row marked busy"""
+    return SimpleNamespace(
+        email=email, start_time=start, end_time=end, availability_type="busy", notes="Blocked"
+    )
+
+
+def generate_slots(request: SchedulingRequest, availability_slots=(), existing_interviews=()):
+    availability_data = {
+        'integrations': {},
+        'existing_interviews': list(existing_interviews),
+        'availability_slots': list(availability_slots),
+        'request': request
+    }
+    return asyncio.run(scheduler_agent._generate_candidate_slots(request, availability_data, None))
+
+
+class TestGenerateCandidateSlots:
+    def test_empty_availability_keeps_every_grid_slot(self):
+        request = make_request(MONDAY.replace(hour=9), MONDAY.replace(hour=11))
+        slots = generate_slots(request)
+
+        assert [slot.start_time.hour * 60 + slot.start_time.minute for slot in slots] == [540, 570, 600]
+        assert all(slot.participants_available == [INTERVIEWER] for slot in slots)
+        assert all(not slot.conflicts for slot in slots)
+
+    def test_window_shorter_than_duration_yields_nothing(self):
+        request = make_request(MONDAY.replace(hour=9), MONDAY.replace(hour=9, minute=30))
+        assert generate_slots(request) == []
+
+    def test_busy_interval_ending_at_slot_start_does_not_conflict(self):
+        request = make_request(MONDAY.replace(hour=10), MONDAY.replace(hour=11))
+        slots = generate_slots(request, [busy_slot(MONDAY.replace(hour=9), MONDAY.replace(hour=10))])
+
+        assert len(slots) == 1
+        assert slots[0].participants_available == [INTERVIEWER]
+
+    def test_busy_interval_starting_at_slot_end_does_not_conflict(self):
+        request = make_request(MONDAY.replace(hour=10), MONDAY.replace(hour=11))
+        slots = generate_slots(request, [busy_slot(MONDAY.replace(hour=11), MONDAY.replace(hour=12))])
+
+        assert len(slots) == 1
+        assert slots[0].participants_available == [INTERVIEWER]
+
+    def test_overlapping_busy_interval_drops_slot(self):
+        request = make_request(MONDAY.replace(hour=10), MONDAY.replace(hour=11))
+        slots = generate_slots(request, [busy_slot(MONDAY.replace(hour=10, minute=59), MONDAY.replace(hour=12))])
+
+        # The only interviewer is busy, so the slot has nobody available and is dropped
+        assert slots == []
+
+    def test_conflicts_name_the_busy_interval(self):
+        request = make_request(MONDAY.replace(hour=10), MONDAY.replace(hour=11))
+        request.interviewer_emails.append("other@example.com")
+        slots = generate_slots(request, [busy_slot(MONDAY.replace(hour=10, minute=30), MONDAY.replace(hour=12))])
+
+        assert len(slots) == 1
+        assert slots[0].participants_unavailable == [INTERVIEWER]
+        assert slots[0].participants_available == ["other@example.com"]
+        assert slots[0].conflicts == ["Busy: Blocked (10:30-12:00)"]
+
+    def test_busy_intervals_of_other_people_are_ignored(self):
+        request = make_request(MONDAY.replace(hour=10), MONDAY.replace(hour=11))
+        slots = generate_slots(
+            request, [busy_slot(MONDAY.replace(hour=10), MONDAY.replace(hour=11), email="someone@example.com")]
+        )
+
+        assert len(slots) == 1
+        assert slots[0].participants_available == [INTERVIEWER]
+
+    def test_aware_datetimes_are_compared_as_instants(self):
+        plus_two = timezone(timedelta(hours=2))
+        start = MONDAY.replace(hour=10, tzinfo=plus_two)  # 08:00 UTC
+        request = make_request(start, start + timedelta(hours=1))
+
+        # Same instant expressed in UTC
+        busy = busy_slot(
+            MONDAY.replace(hour=8, tzinfo=timezone.utc), MONDAY.replace(hour=8, minute=30, tzinfo=timezone.utc)
+        )
+        assert generate_slots(request, [busy]) == []
+
+        # Ends in UTC exactly when the +02:00 slot starts
+        adjacent = busy_slot(
+            MONDAY.replace(hour=7, tzinfo=timezone.utc), MONDAY.replace(hour=8, tzinfo=timezone.utc)
+        )
+        assert len(generate_slots(request, [adjacent])) == 1
+
+
+def rate_limit_response(status_code: int = 200, **headers) -> SimpleNamespace:
+    """Stand-in for an httpx.Response carrying rate limit headers"""
+    return SimpleNamespace(status_code=status_code, headers=headers)
+
+
+class TestHostRateLimiter:
+    def test_burst_is_served_without_waiting(self):
+        async def run():
+            limiter = HostRateLimiter(requests_per_second=1.0, burst=3)
+            started = time.monotonic()
+            for _ in range(3):
+                async with limiter.acquire():
+                    pass
+            return time.monotonic() - started
+
+        assert asyncio.run(run()) < 0.1
+
+    def test_requests_beyond_burst_are_paced(self):
+        async def run():
+            limiter = HostRateLimiter(requests_per_second=20.0, burst=1)
+            started = time.monotonic()
+            for _ in range(3):
+                async with limiter.acquire():
+                    pass
+            return time.monotonic() - started
+
+        # Two refills at 20/s take about 0.1s
+        assert asyncio.run(run()) >= 0.09
+
+    def test_retry_after_blocks_the_bucket(self):
+        limiter = HostRateLimiter(requests_per_second=5.0, burst=5)
+        limiter.update_from_response(rate_limit_response(429, **{'Retry-After': '30'}))
+
+        assert limiter.tokens == 0.0
+        assert limiter.blocked_until - time.monotonic() > 29
+
+    def test_remaining_quota_is_spread_over_the_window(self):
+        limiter = HostRateLimiter(requests_per_second=5.0, burst=5)
+        limiter.update_from_response(
+            rate_limit_response(**{'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': '20'})
+        )
+        assert limiter.rate == pytest.approx(0.5)
+
+        limiter.update_from_response(rate_limit_response(**{'X-RateLimit-Remaining': '1000', 'X-RateLimit-Reset': '1'}))
+        assert limiter.rate == 5.0  # Never faster than the configured rate
+
+    def test_exhausted_quota_waits_for_reset(self):
+        limiter = HostRateLimiter(requests_per_second=5.0, burst=5)
+        limiter.update_from_response(
+            rate_limit_response(**{'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(time.time() + 60)})
+        )
+
+        assert limiter.tokens == 0.0
+        assert 58 < limiter.blocked_until - time.monotonic() <= 60
+
+
+class FakeIMAP:
+    """Returns a canned UID FETCH response"""
+
+    def __init__(self, lines, result='OK'):
+        self.response = SimpleNamespace(result=result, lines=lines)
+
+    async def uid(self, command, *args):
+        return self.response
+
+
+def raw_email(subject: str) -> bytearray:
+    return bytearray(f"From: a@example.com\r\nSubject: {subject}\r\n\r\nBody\r\n".encode())
+
+
+class TestFetchEmailMessages:
+    def fetch(self, lines, uids=("1", "2")):
+        return asyncio.run(resume_source_integrator._fetch_email_messages(FakeIMAP(lines), list(uids)))
+
+    def test_uid_before_body(self):
+        messages = self.fetch([
+            b'1 FETCH (UID 11 BODY[] {50}', raw_email("first"), b')',
+            b'2 FETCH (UID 12 BODY[] {51}', raw_email("second"), b')',
+            b'Fetch completed.'
+        ])
+
+        assert {uid: message['Subject'] for uid, message in messages.items()} == {'11': 'first', '12': 'second'}
+
+    def test_uid_after_body(self):
+        messages = self.fetch([
+            b'1 FETCH (BODY[] {50}', raw_email("first"), b' UID 11)',
+            b'2 FETCH (BODY[] {51}', raw_email("second"), b' UID 12)',
+            b'Fetch completed.'
+        ])
+
+        assert {uid: message['Subject'] for uid, message in messages.items()} == {'11': 'first', '12': 'second'}
+
+    def test_messages_missing_from_the_response_are_absent(self):
+        messages = self.fetch([b'1 FETCH (UID 11 BODY[] {50}', raw_email("first"), b')', b'Fetch completed.'])
+
+        assert list(messages) == ['11']
+
+    def test_failed_fetch_raises(self):
+        with pytest.raises(Exception):
+            asyncio.run(resume_source_integrator._fetch_email_messages(FakeIMAP([], result='NO'), ['1']))
+
+
+class TestExtractCandidateInfo:
+    def extract(self, text, contact_info=None):
+        return asyncio.run(resume_source_integrator._extract_candidate_info(text, contact_info))
+
+    def test_name_and_email_from_text(self):
+        info = self.extract("\n  Jane Doe\nSoftware Engineer\njane.doe@example.com\n")
+
+        assert info == {'name': 'Jane Doe', 'email': 'jane.doe@example.com'}
+
+    def test_contact_info_email_takes_precedence(self):
+        info = self.extract("Jane Doe\njane.doe@example.com", {'email': 'jane@work.example.com'})
+
+        assert info['email'] == 'jane@work.example.com'
+
+    def test_heading_lines_are_not_names(self):
+        assert self.extract("Curriculum Vitae\nExperience") is None
+        assert self.extract("Resume 2024\nExperience") is None
+
+    def test_nothing_found(self):
+        assert self.extract("") is None
+
+
+class TestDeliveryKey:
+    def test_delivery_id_wins(self):
+        key = webhook_processor._delivery_key("indeed", {'event_id': 'evt-1'}, delivery_id="dlv-1")
+
+        assert key == "webhook_delivery:indeed:dlv-1"
+
+    def test_event_id_is_used_without_delivery_id(self):
+        assert webhook_processor._delivery_key("indeed", {'event_id': 'evt-1'}) == "webhook_delivery:indeed:evt-1"
+
+    def test_entity_id_is_not_a_delivery_id(self):
+        first = webhook_processor._delivery_key("indeed", {'id': 'cand-1', 'status': 'applied'})
+        second = webhook_processor._delivery_key("indeed", {'id': 'cand-1', 'status': 'hired'})
+
+        assert first != second
+
+    def test_payload_hash_ignores_key_order(self):
+        first = webhook_processor._delivery_key("indeed", {'a': 1, 'b': 2})
+        second = webhook_processor._delivery_key("indeed", {'b': 2, 'a': 1})
+
+        assert first == second
+        assert first != webhook_processor._delivery_key("linkedin", {'a': 1, 'b': 2})